@@ -1,6 +1,6 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, conlist
 from typing import List, Dict, Optional, Any
 import subprocess
 import sys
@@ -11,13 +11,14 @@ from pathlib import Path
 import os
 from dotenv import load_dotenv
 from datetime import datetime
+from contextlib import asynccontextmanager
 import asyncio
 
 # Import database manager
 try:
     import sys
     sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-    from src.database.db_manager import DatabaseManager, AgentPrediction
+    from src.database.db_manager import DatabaseManager, AgentPrediction, records_to_json, get_db, close_db
     DB_AVAILABLE = True
 except ImportError as e:
     print(f"⚠️  Database manager not available: {e}")
@@ -56,10 +57,19 @@ except ValueError as e:
     print(f"❌ Environment validation failed: {e}")
     sys.exit(1)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the shared database pool on startup and close it on shutdown"""
+    await startup_event()
+    yield
+    if db_manager:
+        await close_db()
+
 app = FastAPI(
     title="AI Hedge Fund API",
     description="Advanced AI-powered hedge fund simulation with multi-agent analysis",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS middleware for production deployment
@@ -160,13 +170,11 @@ async def map_to_agent_prediction(db_manager, agent_name: str, ticker: str, agen
         print(f"⚠️  Error mapping prediction data for {agent_name}/{ticker}: {e}")
         raise
 
-@app.on_event("startup")
 async def startup_event():
-    """Initialize database connection on startup"""
+    """Initialize the shared database manager on startup"""
     global db_manager
     try:
-        db_manager = DatabaseManager()
-        await db_manager.initialize()
+        db_manager = await get_db()
         
         # Run database migration to ensure schema is up to date
         await run_database_migration(db_manager)
@@ -512,6 +520,10 @@ except ImportError as e:
     print(f"  Aggregation services not available: {e}")
     AGGREGATION_AVAILABLE = False
 
+def json_response(payload: Any) -> Response:
+    """Serialize a payload of DB rows with orjson, skipping FastAPI's jsonable_encoder pass"""
+    return Response(content=records_to_json(payload), media_type="application/json")
+
 # Agent Aggregation System API endpoints
 @app.post("/api/aggregate-results")
 async def aggregate_agent_results(tickers: List[str], period_type: str = "monthly"):
@@ -586,7 +598,7 @@ async def get_top_stocks(period_type: str = "monthly", limit: int = 10, criteria
             limit=limit,
             criteria=criteria
         )
-        return {"status": "success", "data": top_stocks}
+        return json_response({"status": "success", "data": top_stocks})
     except Exception as e:
         return {"error": f"Top stocks analysis failed: {str(e)}"}
 
@@ -611,7 +623,7 @@ async def get_system_recommendations(period_type: str = "monthly", limit: int =
             period_type=period_type,
             limit=limit
         )
-        return {"status": "success", "recommendations": recommendations}
+        return json_response({"status": "success", "recommendations": recommendations})
     except Exception as e:
         return {"error": f"System recommendations failed: {str(e)}"}
 
@@ -636,7 +648,7 @@ async def get_aggregation_periods(period_type: str = "monthly", limit: int = 12)
             period_type=period_type,
             limit=limit
         )
-        return {"status": "success", "periods": periods}
+        return json_response({"status": "success", "periods": periods})
     except Exception as e:
         return {"error": f"Periods retrieval failed: {str(e)}"}
 
@@ -663,7 +675,7 @@ async def get_agent_consensus(ticker: str, period_type: str = "monthly", periods
             period_type=period_type,
             periods=periods
         )
-        return {"status": "success", "consensus": consensus}
+        return json_response({"status": "success", "consensus": consensus})
     except Exception as e:
         return {"error": f"Consensus analysis failed: {str(e)}"}
 
@@ -778,6 +790,79 @@ async def get_market_trends(days: int = 30):
             "message": f"Failed to retrieve market trends: {str(e)}"
         }
 
+class AnalyticsSubRequest(BaseModel):
+    """A single read-only analytics query inside a batch request"""
+    endpoint: str  # 'performance', 'predictions', 'consensus' or 'trends'
+    params: Dict[str, Any] = {}
+
+class _AnalyticsParams(BaseModel):
+    """Query parameters of a batched analytics endpoint; unknown keys are rejected"""
+    model_config = ConfigDict(extra='forbid')
+
+class PerformanceParams(_AnalyticsParams):
+    days: int = 30
+    agent_name: Optional[str] = None
+    ticker: Optional[str] = None
+
+class PredictionsParams(_AnalyticsParams):
+    limit: int = 100
+    agent_name: Optional[str] = None
+    ticker: Optional[str] = None
+
+class ConsensusParams(_AnalyticsParams):
+    ticker: str
+    days: int = 7
+
+class TrendsParams(_AnalyticsParams):
+    days: int = 30
+
+# endpoint -> (handler, params model mirroring the handler's query parameters)
+ANALYTICS_BATCH_HANDLERS = {
+    "performance": (get_agent_performance, PerformanceParams),
+    "predictions": (get_recent_predictions, PredictionsParams),
+    "consensus": (get_consensus_analysis, ConsensusParams),
+    "trends": (get_market_trends, TrendsParams),
+}
+
+# Each sub-request hits the database, so bound how far one batch can fan out
+MAX_ANALYTICS_BATCH_SIZE = 10
+
+@app.post("/api/analytics/batch")
+async def get_analytics_batch(sub_requests: conlist(AnalyticsSubRequest, max_length=MAX_ANALYTICS_BATCH_SIZE)):
+    """Run several read-only analytics queries in one round-trip, preserving request order"""
+    async def run_sub_request(sub_request: AnalyticsSubRequest):
+        entry = ANALYTICS_BATCH_HANDLERS.get(sub_request.endpoint)
+        if not entry:
+            return {
+                "status": "error",
+                "message": f"Unknown analytics endpoint: {sub_request.endpoint}"
+            }
+        handler, params_model = entry
+        try:
+            # Same validation and coercion FastAPI applies to the endpoint's query string
+            params = params_model.model_validate(sub_request.params)
+        except ValidationError as e:
+            return {
+                "status": "error",
+                "message": f"Invalid parameters for {sub_request.endpoint}: {str(e)}"
+            }
+        try:
+            return await handler(**params.model_dump())
+        except Exception as e:
+            return {
+                "status": "error",
+                "message": f"Failed to run {sub_request.endpoint}: {str(e)}"
+            }
+    
+    results = await asyncio.gather(*(run_sub_request(sub_request) for sub_request in sub_requests))
+    return {
+        "status": "success",
+        "data": results,
+        "metadata": {
+            "count": len(results)
+        }
+    }
+
 @app.post("/api/analytics/outcome")
 async def record_prediction_outcome(prediction_id: int, actual_outcome: str, actual_price_change: Optional[float] = None):
     """Record the actual outcome of a prediction for performance tracking"""
@@ -1360,5 +1445,6 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=port,
         reload=False,  # Set to True for development
+        loop="auto",  # uvloop when installed, asyncio otherwise
         log_level="info"
     )
@@ -6,7 +6,6 @@ per month/quarter and stores the results in the agent_analysis_periods table.
 """
 
 import asyncio
-import json
 import os
 import sys
 from datetime import datetime, date
@@ -304,7 +303,7 @@ class AggregationService:
                 instrument_id,
                 analysis_period,
                 "monthly",
-                json.dumps(agent_outputs),
+                agent_outputs,
                 consensus_data["total_agents"],
                 consensus_data["bullish_count"],
                 consensus_data["bearish_count"],
@@ -316,7 +315,7 @@ class AggregationService:
                 market_context.get("period_end_price"),
                 market_context.get("period_return"),
                 market_context.get("period_volatility"),
-                json.dumps(market_context.get("market_conditions", {})),
+                market_context.get("market_conditions", {}),
                 datetime.now()
             )
             
@@ -333,13 +332,7 @@ class AggregationService:
         
         async with self.db_manager.get_connection() as conn:
             row = await conn.fetchrow(query, aggregation_id)
-            if row:
-                result = dict(row)
-                # Parse JSON fields
-                result['agent_outputs'] = json.loads(result['agent_outputs'])
-                result['market_conditions'] = json.loads(result['market_conditions'])
-                return result
-            return None
+            return dict(row) if row else None
     
     async def list_aggregations(
         self, 
@@ -373,12 +366,4 @@ class AggregationService:
         async with self.db_manager.get_connection() as conn:
             rows = await conn.fetch(query, *params)
             
-            results = []
-            for row in rows:
-                result = dict(row)
-                # Parse JSON fields
-                result['agent_outputs'] = json.loads(result['agent_outputs'])
-                result['market_conditions'] = json.loads(result['market_conditions'])
-                results.append(result)
-            
-            return results
+            return [dict(row) for row in rows]
@@ -5,7 +5,6 @@ This service computes and maintains stock rankings based on portfolio manager
 verdicts, agent consensus, and performance metrics for user-facing displays.
 """
 
-import json
 from datetime import datetime, date
 from typing import Dict, List, Optional, Any
 from uuid import UUID
@@ -107,13 +106,7 @@ class RankingService:
         async with self.db_manager.get_connection() as conn:
             rows = await conn.fetch(query, ranking_period, ranking_type)
             
-            results = []
-            for row in rows:
-                result = dict(row)
-                result['key_highlights'] = json.loads(result['key_highlights'])
-                results.append(result)
-            
-            return results
+            return [dict(row) for row in rows]
     
     async def _get_portfolio_verdicts_for_period(
         self, 
@@ -153,13 +146,7 @@ class RankingService:
         async with self.db_manager.get_connection() as conn:
             rows = await conn.fetch(query, ranking_period)
             
-            results = []
-            for row in rows:
-                result = dict(row)
-                result['key_factors'] = json.loads(result['key_factors'])
-                results.append(result)
-            
-            return results
+            return [dict(row) for row in rows]
     
     async def _compute_composite_scores(self, verdicts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Compute composite scores for ranking stocks"""
@@ -362,7 +349,7 @@ class RankingService:
                     Decimal(str(score_components.get('upside_score', 0))),  # $12
                     ranking['title'],  # $13
                     ranking['description'],  # $14
-                    json.dumps(ranking['key_highlights']),  # $15
+                    ranking['key_highlights'],  # $15
                     verdict.get('target_price'),  # $16
                     verdict.get('target_price'),  # $17
                     None,  # $18 - current_price (to be updated later)
@@ -416,13 +403,7 @@ class RankingService:
         async with self.db_manager.get_connection() as conn:
             rows = await conn.fetch(query, *params)
             
-            results = []
-            for row in rows:
-                result = dict(row)
-                result['key_highlights'] = json.loads(result['key_highlights'])
-                results.append(result)
-            
-            return results
+            return [dict(row) for row in rows]
     
     async def get_stock_ranking(self, ticker: str, ranking_type: str = "monthly") -> Optional[Dict[str, Any]]:
         """Get ranking for a specific stock"""
@@ -437,11 +418,7 @@ class RankingService:
         
         async with self.db_manager.get_connection() as conn:
             row = await conn.fetchrow(query, ticker, ranking_type)
-            if row:
-                result = dict(row)
-                result['key_highlights'] = json.loads(result['key_highlights'])
-                return result
-            return None
+            return dict(row) if row else None
     
     async def get_rankings_by_period(
         self,
@@ -460,10 +437,4 @@ class RankingService:
         async with self.db_manager.get_connection() as conn:
             rows = await conn.fetch(query, ranking_period, ranking_type)
             
-            results = []
-            for row in rows:
-                result = dict(row)
-                result['key_highlights'] = json.loads(result['key_highlights'])
-                results.append(result)
-            
-            return results
+            return [dict(row) for row in rows]
@@ -6,7 +6,6 @@ agent data and generates final investment verdicts/recommendations.
 """
 
 import asyncio
-import json
 import os
 import sys
 from datetime import datetime, date
@@ -100,13 +99,7 @@ class VerdictService:
         
         async with self.db_manager.get_connection() as conn:
             row = await conn.fetchrow(query, analysis_period_id)
-            if row:
-                result = dict(row)
-                # Parse JSON fields
-                result['agent_outputs'] = json.loads(result['agent_outputs'])
-                result['market_conditions'] = json.loads(result['market_conditions'])
-                return result
-            return None
+            return dict(row) if row else None
     
     async def _get_existing_verdict(
         self, 
@@ -123,11 +116,7 @@ class VerdictService:
         
         async with self.db_manager.get_connection() as conn:
             row = await conn.fetchrow(query, instrument_id, analysis_period)
-            if row:
-                result = dict(row)
-                result['key_factors'] = json.loads(result['key_factors'])
-                return result
-            return None
+            return dict(row) if row else None
     
     async def _generate_verdict_analysis(self, analysis_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -444,7 +433,7 @@ class VerdictService:
                 verdict_data['risk_rating'],
                 Decimal(str(verdict_data['position_size_recommendation'])),
                 verdict_data['reasoning'],
-                json.dumps(verdict_data['key_factors']),
+                verdict_data['key_factors'],
                 verdict_data['agent_consensus_analysis'],
                 verdict_data['market_outlook']
             )
@@ -462,11 +451,7 @@ class VerdictService:
         
         async with self.db_manager.get_connection() as conn:
             row = await conn.fetchrow(query, verdict_id)
-            if row:
-                result = dict(row)
-                result['key_factors'] = json.loads(result['key_factors'])
-                return result
-            return None
+            return dict(row) if row else None
     
     async def list_verdicts(
         self,
@@ -507,10 +492,4 @@ class VerdictService:
         async with self.db_manager.get_connection() as conn:
             rows = await conn.fetch(query, *params)
             
-            results = []
-            for row in rows:
-                result = dict(row)
-                result['key_factors'] = json.loads(result['key_factors'])
-                results.append(result)
-            
-            return results
+            return [dict(row) for row in rows]
@@ -60,6 +60,59 @@ async def add_missing_columns(conn):
         except Exception as e:
             print(f"⚠️  Warning: Could not add column '{column_name}' to table '{table_name}': {e}")
 
+async def update_column_defaults(conn):
+    """Bring column defaults on existing tables in line with schema.sql"""
+    print("🔧 Updating column defaults...")
+    
+    column_defaults = [
+        # Built-in generator, no uuid-ossp call per inserted prediction
+        ("agent_predictions", "id", "gen_random_uuid()"),
+    ]
+    
+    for table_name, column_name, default_expression in column_defaults:
+        try:
+            await conn.execute(
+                f"ALTER TABLE {table_name} ALTER COLUMN {column_name} SET DEFAULT {default_expression}"
+            )
+            print(f"✅ Set default of '{table_name}.{column_name}' to {default_expression}")
+        except Exception as e:
+            print(f"⚠️  Warning: Could not update default of '{table_name}.{column_name}': {e}")
+
+async def ensure_materialized_views(conn):
+    """Create materialized views missing from databases built before they were added"""
+    print("🔧 Checking materialized views...")
+    
+    statements = [
+        """
+        CREATE MATERIALIZED VIEW IF NOT EXISTS mv_agent_perf AS
+        SELECT 
+            a.id,
+            a.name,
+            a.display_name,
+            a.type,
+            COUNT(po.id) as total_predictions,
+            AVG(CASE WHEN po.is_correct THEN 100.0 ELSE 0.0 END) as accuracy_rate,
+            AVG(po.return_score) as avg_return,
+            AVG(po.risk_adjusted_return) as avg_risk_adj_return
+        FROM agents a
+        JOIN agent_predictions ap ON a.id = ap.agent_id
+        JOIN prediction_outcomes po ON ap.id = po.prediction_id
+        WHERE ap.prediction_timestamp >= NOW() - INTERVAL '30 days'
+          AND a.is_active = true
+        GROUP BY a.id, a.name, a.display_name, a.type
+        HAVING COUNT(po.id) >= 5
+        """,
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_agent_perf_id ON mv_agent_perf(id)",
+        "CREATE INDEX IF NOT EXISTS idx_mv_agent_perf_score ON mv_agent_perf(accuracy_rate DESC, avg_return DESC)",
+    ]
+    
+    try:
+        for statement in statements:
+            await conn.execute(statement)
+        print("✅ Materialized view 'mv_agent_perf' is in place")
+    except Exception as e:
+        print(f"⚠️  Warning: Could not create materialized view 'mv_agent_perf': {e}")
+
 async def run_migration():
     """Run the complete database migration"""
     
@@ -91,6 +144,8 @@ async def run_migration():
         
         # Add any missing columns to existing tables
         await add_missing_columns(conn)
+        await update_column_defaults(conn)
+        await ensure_materialized_views(conn)
         
         # Read and execute initial data
         initial_data_path = Path(__file__).parent / 'initial_data.sql'
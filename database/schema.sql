@@ -44,7 +44,7 @@ CREATE TABLE instruments (
 
 -- Agent Predictions Table
 CREATE TABLE agent_predictions (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     agent_id UUID NOT NULL REFERENCES agents(id),
     instrument_id UUID NOT NULL REFERENCES instruments(id),
     prediction_timestamp TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
@@ -346,6 +346,33 @@ CREATE INDEX idx_feature_store_timestamp ON feature_store(feature_timestamp DESC
 CREATE INDEX idx_system_health_component_time ON system_health(component, health_timestamp DESC);
 CREATE INDEX idx_system_health_status ON system_health(status);
 
+-- ============================================================================
+-- MATERIALIZED VIEWS
+-- ============================================================================
+
+-- 30-day agent leaderboard behind get_top_performing_agents, refreshed concurrently
+CREATE MATERIALIZED VIEW mv_agent_perf AS
+SELECT 
+    a.id,
+    a.name,
+    a.display_name,
+    a.type,
+    COUNT(po.id) as total_predictions,
+    AVG(CASE WHEN po.is_correct THEN 100.0 ELSE 0.0 END) as accuracy_rate,
+    AVG(po.return_score) as avg_return,
+    AVG(po.risk_adjusted_return) as avg_risk_adj_return
+FROM agents a
+JOIN agent_predictions ap ON a.id = ap.agent_id
+JOIN prediction_outcomes po ON ap.id = po.prediction_id
+WHERE ap.prediction_timestamp >= NOW() - INTERVAL '30 days'
+  AND a.is_active = true
+GROUP BY a.id, a.name, a.display_name, a.type
+HAVING COUNT(po.id) >= 5;
+
+-- Unique index required for REFRESH ... CONCURRENTLY
+CREATE UNIQUE INDEX idx_mv_agent_perf_id ON mv_agent_perf(id);
+CREATE INDEX idx_mv_agent_perf_score ON mv_agent_perf(accuracy_rate DESC, avg_return DESC);
+
 -- ============================================================================
 -- FUNCTIONS & TRIGGERS
 -- ============================================================================
@@ -0,0 +1,24 @@
+"""Deployable backend; exposes the direct backtester without importing it up front."""
+
+import importlib
+import os
+import sys
+
+_SRC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src')
+
+
+def __getattr__(name):
+    if name == "run_direct_backtest":
+        # Reuse a direct_backtester the process has already loaded (e.g. by the API or a
+        # previous test run) instead of touching sys.path again
+        module = sys.modules.get("direct_backtester")
+        if module is None:
+            # The backend modules import each other by bare name (e.g. `from backtester import ...`),
+            # so src has to be importable before direct_backtester is loaded
+            if _SRC_PATH not in sys.path:
+                sys.path.append(_SRC_PATH)
+            module = importlib.import_module("direct_backtester")
+        run_direct_backtest = module.run_direct_backtest
+        globals()[name] = run_direct_backtest
+        return run_direct_backtest
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
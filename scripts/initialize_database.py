@@ -57,7 +57,7 @@ CREATE TABLE IF NOT EXISTS instruments (
 
 -- Agent predictions table - stores predictions made by agents
 CREATE TABLE IF NOT EXISTS agent_predictions (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     agent_id UUID NOT NULL REFERENCES agents(id) ON DELETE CASCADE,
     instrument_id UUID NOT NULL REFERENCES instruments(id) ON DELETE CASCADE,
     signal VARCHAR(20) NOT NULL CHECK (signal IN ('bullish', 'bearish', 'neutral')),
@@ -5,8 +5,9 @@ Test script to validate complete database integration with AI Hedge Fund platfor
 
 import os
 import sys
+import argparse
 import asyncio
-import requests
+import httpx
 import json
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
@@ -17,11 +18,17 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 # Load environment variables
 load_dotenv()
 
-def test_backend_health():
+BACKEND_URL = "http://localhost:8000"
+
+# Fail fast on a dead listener; reads get the full budget
+PROBE_TIMEOUT = httpx.Timeout(10, connect=2)
+ANALYSIS_TIMEOUT = httpx.Timeout(120, connect=2)  # 2 minutes for analysis
+
+async def test_backend_health(client):
     """Test backend health and database connectivity"""
     try:
         print("🧪 Testing backend health check...")
-        response = requests.get("http://localhost:8000/health", timeout=10)
+        response = await client.get(f"{BACKEND_URL}/health")
         
         if response.status_code == 200:
             health_data = response.json()
@@ -37,7 +44,7 @@ def test_backend_health():
         print(f"❌ Backend health check failed: {e}")
         return False
 
-def test_agent_analysis():
+async def test_agent_analysis(client):
     """Test running an agent analysis and verify data storage"""
     try:
         print("\n🧪 Testing agent analysis with database storage...")
@@ -54,11 +61,7 @@ def test_agent_analysis():
         print(f"   Date range: {analysis_request['start_date']} to {analysis_request['end_date']}")
         
         # Make API request
-        response = requests.post(
-            "http://localhost:8000/api/run",
-            json=analysis_request,
-            timeout=120  # 2 minutes timeout for analysis
-        )
+        response = await client.post(f"{BACKEND_URL}/api/run", json=analysis_request, timeout=ANALYSIS_TIMEOUT)
         
         if response.status_code == 200:
             result = response.json()
@@ -93,30 +96,34 @@ def test_agent_analysis():
         print(f"❌ Agent analysis test failed: {e}")
         return False
 
-def test_database_endpoints():
+async def _probe_status(client, url):
+    """Return the HTTP status of a GET request"""
+    response = await client.get(url)
+    return response.status_code
+
+async def test_database_endpoints(client):
     """Test database-specific API endpoints"""
     try:
         print("\n🧪 Testing database API endpoints...")
         
-        # Test agent performance endpoint
-        try:
-            response = requests.get("http://localhost:8000/api/agent-performance?days=30", timeout=10)
-            if response.status_code == 200:
-                print("✅ Agent performance endpoint working")
-            else:
-                print(f"⚠️  Agent performance endpoint returned: {response.status_code}")
-        except Exception as e:
-            print(f"⚠️  Agent performance endpoint test failed: {e}")
+        endpoints = [
+            ("Agent performance", f"{BACKEND_URL}/api/agent-performance?days=30"),
+            ("Recent predictions", f"{BACKEND_URL}/api/recent-predictions?limit=10"),
+        ]
         
-        # Test recent predictions endpoint
-        try:
-            response = requests.get("http://localhost:8000/api/recent-predictions?limit=10", timeout=10)
-            if response.status_code == 200:
-                print("✅ Recent predictions endpoint working")
+        # Both probes are independent GETs, so issue them concurrently
+        results = await asyncio.gather(
+            *(_probe_status(client, url) for _, url in endpoints),
+            return_exceptions=True
+        )
+        
+        for (label, _), result in zip(endpoints, results):
+            if isinstance(result, Exception):
+                print(f"⚠️  {label} endpoint test failed: {result}")
+            elif result == 200:
+                print(f"✅ {label} endpoint working")
             else:
-                print(f"⚠️  Recent predictions endpoint returned: {response.status_code}")
-        except Exception as e:
-            print(f"⚠️  Recent predictions endpoint test failed: {e}")
+                print(f"⚠️  {label} endpoint returned: {result}")
         
         return True
         
@@ -159,30 +166,50 @@ async def test_direct_database_access():
         print(f"❌ Direct database access test failed: {e}")
         return False
 
+async def run_integration_tests(full=False):
+    """Run all integration tests, returning the number that passed"""
+    tests_passed = 0
+    
+    # One client (and connection pool) shared by every HTTP probe
+    async with httpx.AsyncClient(timeout=PROBE_TIMEOUT) as client:
+        # Test 1: Backend Health
+        backend_ok = await test_backend_health(client)
+        if backend_ok:
+            tests_passed += 1
+        
+        if backend_ok:
+            # Test 2: Agent Analysis (LLM-backed and slow, so opt-in)
+            if full and await test_agent_analysis(client):
+                tests_passed += 1
+            
+            # Test 3: Database Endpoints
+            if await test_database_endpoints(client):
+                tests_passed += 1
+        else:
+            # The remaining HTTP tests cannot pass against a dead backend
+            print("\n⏭️  Skipping agent analysis and endpoint tests - backend is unavailable")
+    
+    # Test 4: Direct Database Access
+    if await test_direct_database_access():
+        tests_passed += 1
+    
+    return tests_passed
+
 def main():
     """Run all integration tests"""
+    parser = argparse.ArgumentParser(description="Validate AI Hedge Fund database integration")
+    parser.add_argument("--full", action="store_true", help="Also run the live agent analysis test (up to 2 minutes)")
+    args = parser.parse_args()
+    
     print("=" * 80)
     print("🚀 AI HEDGE FUND DATABASE INTEGRATION VALIDATION")
     print("=" * 80)
     
-    tests_passed = 0
-    total_tests = 4
+    if not args.full:
+        print("ℹ️  Skipping agent analysis test (pass --full to include it)")
     
-    # Test 1: Backend Health
-    if test_backend_health():
-        tests_passed += 1
-    
-    # Test 2: Agent Analysis
-    if test_agent_analysis():
-        tests_passed += 1
-    
-    # Test 3: Database Endpoints
-    if test_database_endpoints():
-        tests_passed += 1
-    
-    # Test 4: Direct Database Access
-    if asyncio.run(test_direct_database_access()):
-        tests_passed += 1
+    total_tests = 4 if args.full else 3
+    tests_passed = asyncio.run(run_integration_tests(full=args.full))
     
     print("\n" + "=" * 80)
     print(f"🎯 INTEGRATION TEST RESULTS: {tests_passed}/{total_tests} PASSED")
@@ -17,8 +17,35 @@ from datetime import datetime
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
-from dotenv import load_dotenv
-load_dotenv()
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def write_validation_report(validation_report):
+    """Atomically write the validation report and return its path.
+    
+    Writing to a temp file and renaming means readers never see a half-written report.
+    """
+    report_path = project_root / "logs" / "schema_validation_report.json"
+    report_path.parent.mkdir(exist_ok=True)
+    
+    if orjson is not None:
+        data = orjson.dumps(validation_report, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(validation_report, indent=2).encode()
+    
+    tmp_path = report_path.with_suffix(".json.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, report_path)
+    return report_path
+
+# Columns the backend relies on; missing agents columns only produce a warning
+REQUIRED_COLUMNS = {
+    'agent_predictions': {'position_size_pct', 'agent_id', 'confidence', 'signal', 'reasoning'},
+    'agents': {'id', 'name', 'display_name', 'type', 'is_active'},
+    'instruments': {'id', 'ticker', 'name', 'market', 'currency'},
+}
 
 async def validate_and_sync_database_schema():
     """Validate and synchronize database schema for startup"""
@@ -27,37 +54,30 @@ async def validate_and_sync_database_schema():
         
         from src.database.db_manager import DatabaseManager
         
-        # Create fresh database manager
+        # A freshly created pool already sees the latest schema
         db_manager = DatabaseManager()
         await db_manager.initialize()
         
         print("✅ Database connection established")
         
-        # Force connection pool refresh to ensure latest schema
-        print("🔄 Refreshing database connection pool...")
-        await db_manager.close()
-        db_manager = DatabaseManager()
-        await db_manager.initialize()
-        
-        print("✅ Connection pool refreshed")
-        
         # Validate critical schema elements
         print("🧪 Validating database schema...")
         
         async with db_manager.get_connection() as conn:
-            # Check agent_predictions table schema
-            predictions_result = await conn.fetch("""
-                SELECT column_name, data_type, is_nullable
+            # Fetch every required table's columns in a single catalog round-trip
+            columns_result = await conn.fetch("""
+                SELECT table_name, column_name
                 FROM information_schema.columns 
-                WHERE table_name = 'agent_predictions'
-                AND column_name IN ('position_size_pct', 'agent_id', 'confidence', 'signal', 'reasoning')
-                ORDER BY column_name;
-            """)
+                WHERE table_name = ANY($1::text[]);
+            """, list(REQUIRED_COLUMNS))
             
-            required_predictions_columns = {
-                'position_size_pct', 'agent_id', 'confidence', 'signal', 'reasoning'
-            }
-            found_predictions_columns = {row['column_name'] for row in predictions_result}
+            table_columns = {table_name: set() for table_name in REQUIRED_COLUMNS}
+            for row in columns_result:
+                table_columns[row['table_name']].add(row['column_name'])
+            
+            # Check agent_predictions table schema
+            required_predictions_columns = REQUIRED_COLUMNS['agent_predictions']
+            found_predictions_columns = table_columns['agent_predictions'] & required_predictions_columns
             
             print(f"📊 agent_predictions columns validated: {len(found_predictions_columns)}/{len(required_predictions_columns)}")
             
@@ -66,16 +86,8 @@ async def validate_and_sync_database_schema():
                 raise Exception(f"❌ Missing required columns in agent_predictions: {missing}")
             
             # Check agents table schema
-            agents_result = await conn.fetch("""
-                SELECT column_name, data_type, is_nullable
-                FROM information_schema.columns 
-                WHERE table_name = 'agents'
-                AND column_name IN ('id', 'name', 'display_name', 'type', 'is_active')
-                ORDER BY column_name;
-            """)
-            
-            required_agents_columns = {'id', 'name', 'display_name', 'type', 'is_active'}
-            found_agents_columns = {row['column_name'] for row in agents_result}
+            required_agents_columns = REQUIRED_COLUMNS['agents']
+            found_agents_columns = table_columns['agents'] & required_agents_columns
             
             print(f"📊 agents columns validated: {len(found_agents_columns)}/{len(required_agents_columns)}")
             
@@ -87,16 +99,8 @@ async def validate_and_sync_database_schema():
                 # Continue with warnings instead of failing
             
             # Check instruments table schema
-            instruments_result = await conn.fetch("""
-                SELECT column_name, data_type, is_nullable
-                FROM information_schema.columns 
-                WHERE table_name = 'instruments'
-                AND column_name IN ('id', 'ticker', 'name', 'market', 'currency')
-                ORDER BY column_name;
-            """)
-            
-            required_instruments_columns = {'id', 'ticker', 'name', 'market', 'currency'}
-            found_instruments_columns = {row['column_name'] for row in instruments_result}
+            required_instruments_columns = REQUIRED_COLUMNS['instruments']
+            found_instruments_columns = table_columns['instruments'] & required_instruments_columns
             
             print(f"📊 instruments columns validated: {len(found_instruments_columns)}/{len(required_instruments_columns)}")
             
@@ -107,47 +111,39 @@ async def validate_and_sync_database_schema():
             # Test database connectivity and basic operations
             print("🧪 Testing database operations...")
             
-            # Count existing records
-            agent_count = await conn.fetchval("SELECT COUNT(*) FROM agents WHERE is_active = true;")
-            instrument_count = await conn.fetchval("SELECT COUNT(*) FROM instruments;")
-            prediction_count = await conn.fetchval("SELECT COUNT(*) FROM agent_predictions;")
+            # Count existing records in one round-trip. agent_predictions grows without
+            # bound, so use the planner's row estimate instead of a full scan
+            counts = await conn.fetchrow("""
+                SELECT
+                    (SELECT COUNT(*) FROM agents WHERE is_active = true) AS agents,
+                    (SELECT COUNT(*) FROM instruments) AS instruments,
+                    (SELECT GREATEST(reltuples, 0)::bigint FROM pg_class
+                     WHERE oid = to_regclass('agent_predictions')) AS predictions;
+            """)
+            agent_count = counts['agents']
+            instrument_count = counts['instruments']
+            prediction_count = counts['predictions']
             
             print(f"📊 Database statistics:")
             print(f"  Active agents: {agent_count}")
             print(f"  Instruments: {instrument_count}")
-            print(f"  Predictions: {prediction_count}")
+            print(f"  Predictions (estimated): {prediction_count}")
             
-            # Test a sample prediction insertion (will be rolled back)
+            # Parse and plan the prediction INSERT without executing it: column
+            # existence and type coercion are checked, but no row, WAL or trigger work
             print("🧪 Testing prediction insertion capability...")
             
-            if agent_count > 0 and instrument_count > 0:
-                # Get sample agent and instrument
-                agent = await conn.fetchrow("SELECT id, display_name FROM agents WHERE is_active = true LIMIT 1;")
-                instrument = await conn.fetchrow("SELECT id, ticker FROM instruments LIMIT 1;")
-                
-                if agent and instrument:
-                    # Test insertion in a transaction (will be rolled back)
-                    async with conn.transaction():
-                        test_id = await conn.fetchval("""
-                            INSERT INTO agent_predictions (
-                                agent_id, instrument_id, signal, confidence, reasoning,
-                                market_conditions, financial_metrics, price_data,
-                                target_price, stop_loss, time_horizon_days, position_size_pct,
-                                model_version, feature_vector, external_factors
-                            ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15)
-                            RETURNING id
-                        """,
-                        agent['id'], instrument['id'], 'bullish', 50.0, '{"test": "schema_validation"}',
-                        '{}', '{}', '{}', None, None, 30, None,
-                        '1.0', '{}', '{}'
-                        )
-                        
-                        print(f"✅ Test prediction insertion successful: {test_id}")
-                        
-                        # Rollback the transaction
-                        raise Exception("Test rollback - schema validation complete")
-            else:
-                print("⚠️  No agents or instruments found - skipping insertion test")
+            # conn.prepare() leaves no named statement behind on the pooled connection
+            await conn.prepare("""
+                INSERT INTO agent_predictions (
+                    agent_id, instrument_id, signal, confidence, reasoning,
+                    market_conditions, financial_metrics, price_data,
+                    target_price, stop_loss, time_horizon_days, position_size_pct,
+                    model_version, feature_vector, external_factors
+                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15)
+            """)
+            
+            print("✅ Prediction insertion statement validated")
         
         await db_manager.close()
         
@@ -160,7 +156,7 @@ async def validate_and_sync_database_schema():
             "agent_predictions_table": "validated",
             "agents_table": "validated", 
             "instruments_table": "validated",
-            "prediction_insertion": "tested",
+            "prediction_insertion": "validated",
             "statistics": {
                 "active_agents": agent_count,
                 "instruments": instrument_count,
@@ -169,11 +165,7 @@ async def validate_and_sync_database_schema():
         }
         
         # Save validation report
-        report_path = project_root / "logs" / "schema_validation_report.json"
-        report_path.parent.mkdir(exist_ok=True)
-        
-        with open(report_path, 'w') as f:
-            json.dump(validation_report, f, indent=2)
+        report_path = write_validation_report(validation_report)
         
         print(f"✅ Validation report saved: {report_path}")
         print("🎉 Database schema validation and synchronization completed successfully!")
@@ -181,48 +173,26 @@ async def validate_and_sync_database_schema():
         return True
         
     except Exception as e:
-        if "Test rollback" in str(e):
-            print("✅ Test insertion successful (rolled back as expected)")
-            
-            # Generate success report
-            validation_report = {
-                "timestamp": datetime.now().isoformat(),
-                "status": "success",
-                "database_connection": "healthy",
-                "schema_validation": "passed",
-                "test_insertion": "successful"
-            }
-            
-            report_path = project_root / "logs" / "schema_validation_report.json"
-            report_path.parent.mkdir(exist_ok=True)
-            
-            with open(report_path, 'w') as f:
-                json.dump(validation_report, f, indent=2)
-            
-            print("🎉 Database schema validation and synchronization completed successfully!")
-            return True
-        else:
-            print(f"❌ Database schema validation failed: {e}")
-            
-            # Generate failure report
-            validation_report = {
-                "timestamp": datetime.now().isoformat(),
-                "status": "failed",
-                "error": str(e),
-                "database_connection": "unknown",
-                "schema_validation": "failed"
-            }
-            
-            report_path = project_root / "logs" / "schema_validation_report.json"
-            report_path.parent.mkdir(exist_ok=True)
-            
-            with open(report_path, 'w') as f:
-                json.dump(validation_report, f, indent=2)
-            
-            import traceback
-            traceback.print_exc()
-            return False
+        print(f"❌ Database schema validation failed: {e}")
+        
+        # Generate failure report
+        validation_report = {
+            "timestamp": datetime.now().isoformat(),
+            "status": "failed",
+            "error": str(e),
+            "database_connection": "unknown",
+            "schema_validation": "failed"
+        }
+        
+        write_validation_report(validation_report)
+        
+        import traceback
+        traceback.print_exc()
+        return False
 
 if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
+    
     success = asyncio.run(validate_and_sync_database_schema())
     sys.exit(0 if success else 1)
@@ -4,79 +4,273 @@ Connects existing agent analysis system with PostgreSQL database for persistence
 """
 
 import asyncio
+import hashlib
+import json
 import logging
+import math
 from datetime import datetime, date
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, Tuple
 import uuid
+from dataclasses import dataclass, field
 from decimal import Decimal
 
-from .db_manager import DatabaseManager, AgentPrediction, PredictionOutcome, create_database_manager
+import numpy as np
+import pandas as pd
+
+from .db_manager import DatabaseManager, AgentPrediction, PredictionOutcome, create_database_manager, get_db, run_async
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Candidate keys for each scalar prediction field, in priority order
+SCALAR_FIELD_KEYS = {
+    'signal': ('signal', 'recommendation', 'action', 'position'),
+    'confidence': ('confidence', 'confidence_score', 'certainty', 'probability'),
+    'target_price': ('target_price', 'price_target', 'target'),
+    'stop_loss': ('stop_loss', 'stop_price', 'risk_limit'),
+    'time_horizon_days': ('time_horizon', 'horizon_days', 'holding_period'),
+    'position_size_pct': ('position_size', 'allocation', 'weight'),
+}
+
+# Dispatch table: agent data key -> (field, rank); lower rank wins
+KEY_TO_FIELD = {
+    key: (field_name, rank)
+    for field_name, keys in SCALAR_FIELD_KEYS.items()
+    for rank, key in enumerate(keys)
+}
+
+FINANCIAL_KEYS = frozenset(('pe_ratio', 'pb_ratio', 'debt_to_equity', 'roe', 'revenue_growth',
+                            'earnings_growth', 'current_ratio', 'quick_ratio', 'gross_margin'))
+FEATURE_KEYS = frozenset(('sma_10', 'sma_50', 'rsi', 'macd', 'bollinger_bands',
+                          'volume_ratio', 'beta', 'volatility'))
+# Only free-text rationale goes into the reasoning JSONB; other fields have their own columns
+REASONING_KEYS = frozenset(('reasoning', 'analysis', 'rationale', 'explanation', 'details'))
+
+# Raw signal value (lowercased) -> normalized signal
+_SIGNAL_MAP = {
+    **dict.fromkeys(('buy', 'bullish', 'long', 'positive'), 'bullish'),
+    **dict.fromkeys(('sell', 'bearish', 'short', 'negative'), 'bearish'),
+    **dict.fromkeys(('hold', 'neutral', 'wait'), 'neutral'),
+}
+
+def _normalize_signal(value: Any) -> Optional[str]:
+    """Map a raw signal value onto bullish/bearish/neutral"""
+    if not isinstance(value, str):
+        value = str(value)
+    # Already-canonical values (the common case) skip the lowercase copy
+    return _SIGNAL_MAP.get(value) or _SIGNAL_MAP.get(value.lower())
+
+def _finite_float(value: Any) -> float:
+    """Parse a number, treating NaN and infinities as missing like the vectorized build"""
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f"expected a finite number, got {value!r}")
+    return number
+
+def _normalize_confidence(value: Any) -> float:
+    """Parse a confidence value onto the 0-100 scale"""
+    confidence = _finite_float(value)
+    # Normalize to 0-100 if needed
+    if confidence <= 1.0:
+        confidence *= 100
+    return min(100.0, max(0.0, confidence))
+
+def _parse_horizon_days(value: Any) -> int:
+    """Parse a time horizon in whole days, rejecting fractions such as 30.5"""
+    days = _finite_float(value)
+    if not days.is_integer():
+        raise ValueError(f"time horizon must be whole days, got {value!r}")
+    return int(days)
+
+def _with_str_keys(value: Any) -> Any:
+    """Copy of nested dicts/lists with every key stringified, so sort_keys cannot fail"""
+    if isinstance(value, dict):
+        return {str(k): _with_str_keys(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_with_str_keys(v) for v in value]
+    return value
+
+def _source_hash(agent_data: Dict[str, Any]) -> str:
+    """Fingerprint of the full agent output for auditing without storing it twice"""
+    # Mixed int/str or tuple keys are valid agent output; default=str only covers values
+    payload = json.dumps(_with_str_keys(agent_data), sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def _dict_or_none(d: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Return the dict, or None when every value is None so the column stays NULL"""
+    return d if any(v is not None for v in d.values()) else None
+
+FIELD_PARSERS = {
+    'signal': _normalize_signal,
+    'confidence': _normalize_confidence,
+    'target_price': _finite_float,
+    'stop_loss': _finite_float,
+    'time_horizon_days': _parse_horizon_days,
+    'position_size_pct': _finite_float,
+}
+
+@dataclass
+class ExtractedFields:
+    """Prediction fields pulled out of one agent's data for one stock"""
+    signal: Optional[str] = None
+    confidence: Optional[float] = None
+    target_price: Optional[float] = None
+    stop_loss: Optional[float] = None
+    time_horizon_days: Optional[int] = None
+    position_size_pct: Optional[float] = None
+    reasoning: Dict[str, Any] = field(default_factory=dict)
+    financial_metrics: Dict[str, Any] = field(default_factory=dict)
+    feature_vector: Dict[str, Any] = field(default_factory=dict)
+
+# Batches with more (agent, stock) pairs than this are built column-wise with pandas
+VECTORIZE_THRESHOLD = 1000
+
+# Upper bound on concurrent agent lookups per analysis
+MAX_CONCURRENT_LOOKUPS = 20
+
+class PredictionWriter:
+    """Background writer that coalesces queued predictions into batched inserts"""
+    
+    def __init__(self, db_manager: DatabaseManager, batch_size: int = 500,
+                 flush_interval_ms: int = 50, backlog: int = 10000):
+        self.db_manager = db_manager
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        # Bounded so producers block instead of buffering without limit
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=backlog)
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        """Start the background flush task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._flusher())
+    
+    async def submit(self, predictions: List[AgentPrediction], wait: bool = False) -> List[Any]:
+        """Queue predictions for writing
+        
+        With wait=True, returns each prediction's ID (or the exception that
+        failed its batch) once written; otherwise returns as soon as queued.
+        """
+        loop = asyncio.get_running_loop()
+        futures = []
+        for prediction in predictions:
+            future = loop.create_future() if wait else None
+            await self._queue.put((prediction, future))
+            if future is not None:
+                futures.append(future)
+        
+        if not wait:
+            return []
+        return await asyncio.gather(*futures, return_exceptions=True)
+    
+    async def _flusher(self):
+        """Drain the queue in batches bounded by size and flush interval"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            await self._write(batch)
+    
+    async def _write(self, batch: List[Tuple[AgentPrediction, Optional[asyncio.Future]]]):
+        """Write one batch and resolve any waiting submitters"""
+        try:
+            prediction_ids = await self.db_manager.save_agent_predictions_batch(
+                [prediction for prediction, _ in batch]
+            )
+            if len(prediction_ids) != len(batch):
+                # Unmatched futures would never resolve and submit(wait=True) would hang
+                raise RuntimeError(f"Expected {len(batch)} prediction IDs, got {len(prediction_ids)}")
+        except Exception as e:
+            logger.error(f"Failed to write batch of {len(batch)} predictions: {e}")
+            for _, future in batch:
+                if future is not None and not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future), prediction_id in zip(batch, prediction_ids):
+                if future is not None and not future.done():
+                    future.set_result(prediction_id)
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+    
+    async def close(self):
+        """Flush everything queued, then stop the background task"""
+        if self._task is None:
+            return
+        
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
 class AgentDatabaseIntegrator:
     """Integrates agent analysis results with database storage"""
     
     def __init__(self, db_manager: Optional[DatabaseManager] = None):
         self.db_manager = db_manager
-        self._agent_cache = {}  # Cache for agent ID lookups
-        self._instrument_cache = {}  # Cache for instrument ID lookups
+        self._owns_db_manager = db_manager is None  # Only close a manager we created
+        self._writer: Optional[PredictionWriter] = None
     
     async def initialize(self):
         """Initialize database connection and cache lookups"""
         if not self.db_manager:
             self.db_manager = await create_database_manager()
         
-        # Pre-load agent and instrument mappings
-        await self._load_agent_cache()
-        await self._load_instrument_cache()
+        # Warm the database manager's agent lookup cache
+        agents = await self.db_manager.get_all_active_agents()
+        logger.info(f"Loaded {len(agents)} agents into cache")
+        self._get_writer()
         
         logger.info("Agent Database Integrator initialized successfully")
     
-    async def _load_agent_cache(self):
-        """Load agent name to ID mappings"""
-        agents = await self.db_manager.get_all_active_agents()
-        for agent in agents:
-            self._agent_cache[agent['name']] = agent['id']
-        
-        logger.info(f"Loaded {len(self._agent_cache)} agents into cache")
+    def _get_writer(self) -> PredictionWriter:
+        """Return the running prediction writer, starting it on first use"""
+        if self._writer is None:
+            self._writer = PredictionWriter(self.db_manager)
+            self._writer.start()
+        return self._writer
     
-    async def _load_instrument_cache(self):
-        """Load instrument ticker to ID mappings"""
-        # This will be populated as instruments are encountered
-        pass
+    async def _get_agent_id(self, agent_name: str) -> Optional[uuid.UUID]:
+        """Get agent ID; the database manager caches the lookup"""
+        agent = await self.db_manager.get_agent_by_name(agent_name)
+        return agent['id'] if agent else None
     
-    async def _get_or_create_instrument_id(self, ticker: str, 
-                                         name: Optional[str] = None) -> uuid.UUID:
-        """Get instrument ID, creating if necessary"""
-        if ticker in self._instrument_cache:
-            return self._instrument_cache[ticker]
-        
-        # Try to get from database
-        instrument = await self.db_manager.get_instrument_by_ticker(ticker)
-        
-        if instrument:
-            instrument_id = instrument['id']
-        else:
-            # Create new instrument
-            instrument_name = name or ticker
-            instrument_id = await self.db_manager.create_instrument_if_not_exists(
-                ticker=ticker,
-                name=instrument_name,
-                market='US' if '.' not in ticker else 'NSE',  # Simple heuristic
-                currency='USD' if '.' not in ticker else 'INR'
-            )
-        
-        self._instrument_cache[ticker] = instrument_id
-        return instrument_id
+    @staticmethod
+    def _instrument_market(ticker: str) -> Tuple[str, str]:
+        """Guess (market, currency) for a ticker"""
+        # Simple heuristic: exchange-suffixed tickers are Indian listings
+        return ('US', 'USD') if '.' not in ticker else ('NSE', 'INR')
+    
+    async def _prefetch_instruments(self, tickers: List[str]) -> Dict[str, uuid.UUID]:
+        """Resolve instrument IDs for all tickers; the database manager caches the lookups"""
+        return await self.db_manager.resolve_instrument_ids(
+            [(t, t, *self._instrument_market(t)) for t in tickers]
+        )
     
-    async def store_agent_analysis_results(self, analysis_results: Dict[str, Any]) -> Dict[str, Any]:
+    async def store_agent_analysis_results(self, analysis_results: Dict[str, Any],
+                                           wait: bool = True) -> Dict[str, Any]:
         """
         Store complete agent analysis results in database
         
         Args:
             analysis_results: Full analysis results from agent run
+            wait: Block until the predictions are written and report their IDs.
+                Pass wait=False to return once they are queued for the background
+                writer; write failures are then only logged and nothing is reported
+                as stored
             
         Returns:
             Dictionary with storage statistics and prediction IDs
@@ -84,61 +278,133 @@ class AgentDatabaseIntegrator:
         try:
             storage_stats = {
                 'predictions_stored': 0,
+                'predictions_queued': 0,
                 'agents_processed': 0,
-                'instruments_processed': set(),
+                'instruments_processed': [],
                 'prediction_ids': [],
                 'errors': []
             }
             
             # Extract stock symbols from analysis
-            stocks = analysis_results.get('metadata', {}).get('stocks', [])
+            analysis_metadata = analysis_results.get('metadata', {})
+            stocks = analysis_metadata.get('stocks', [])
             if isinstance(stocks, str):
                 stocks = [stocks]  # Handle single stock case
+            stocks = list(dict.fromkeys(stocks))  # Drop duplicates, keep order
             
-            # Process each agent's results
             agents = analysis_results.get('agents', [])
+            agent_names = list(dict.fromkeys(agent_data.get('name', '') for agent_data in agents))
+            
+            # Resolve instruments and agents concurrently, capping DB lookups in flight
+            semaphore = asyncio.Semaphore(MAX_CONCURRENT_LOOKUPS)
+            
+            async def lookup_agent(agent_name: str) -> Optional[uuid.UUID]:
+                async with semaphore:
+                    return await self._get_agent_id(agent_name)
+            
+            instrument_result, *agent_results = await asyncio.gather(
+                self._prefetch_instruments(stocks),
+                *(lookup_agent(agent_name) for agent_name in agent_names),
+                return_exceptions=True
+            )
+            
+            instrument_ids = {}
+            if isinstance(instrument_result, Exception):
+                error_msg = f"Failed to resolve instruments {stocks}: {instrument_result}"
+                logger.error(error_msg)
+                storage_stats['errors'].append(error_msg)
+            else:
+                instrument_ids = instrument_result
+            agent_ids = dict(zip(agent_names, agent_results))
+            
+            # Metadata-derived context depends only on the stock, so build it once per stock
+            model_version = analysis_metadata.get('version', '1.0')
+            external_factors = self._extract_external_factors(analysis_metadata)
+            stock_context = {
+                stock: {
+                    'market': self._extract_market_conditions(analysis_metadata, stock),
+                    'price': self._extract_price_data(analysis_metadata, stock),
+                    'external': external_factors
+                }
+                for stock in stocks
+            }
+            
+            # Collect every (agent, stock) pair first, then build and write them in one batch
+            pairs = []
             
             for agent_data in agents:
+                agent_name = agent_data.get('name', '')
+                agent_id = agent_ids.get(agent_name)
+                
+                if isinstance(agent_id, Exception):
+                    error_msg = f"Failed to process agent {agent_name or 'unknown'}: {agent_id}"
+                    logger.error(error_msg)
+                    storage_stats['errors'].append(error_msg)
+                    continue
+                if not agent_id:
+                    storage_stats['errors'].append(f"Agent not found: {agent_name}")
+                    continue
+                
+                pairs.extend(
+                    (agent_name, agent_id, instrument_ids[stock], stock, agent_data)
+                    for stock in stocks if stock in instrument_ids
+                )
+                storage_stats['agents_processed'] += 1
+            
+            predictions = None
+            if len(pairs) > VECTORIZE_THRESHOLD:
                 try:
-                    agent_name = agent_data.get('name', '')
-                    agent_id = self._agent_cache.get(agent_name)
+                    predictions, prediction_stocks = self._build_predictions_vectorized(
+                        pairs, stock_context, model_version
+                    )
+                except Exception as e:
+                    logger.error(f"Vectorized build failed, falling back to per-row build: {e}")
+                    predictions = None
+            
+            if predictions is None:
+                predictions = []
+                prediction_stocks = []
+                for agent_name, agent_id, instrument_id, stock, agent_data in pairs:
+                    prediction, error = self._build_agent_stock_prediction(
+                        agent_id=agent_id,
+                        instrument_id=instrument_id,
+                        agent_data=agent_data,
+                        stock=stock,
+                        context=stock_context[stock],
+                        model_version=model_version
+                    )
                     
-                    if not agent_id:
-                        storage_stats['errors'].append(f"Agent not found: {agent_name}")
+                    if prediction:
+                        predictions.append(prediction)
+                        prediction_stocks.append(stock)
+                    elif error:
+                        error_msg = f"Failed to build prediction for {agent_name}/{stock}: {error}"
+                        logger.error(error_msg)
+                        storage_stats['errors'].append(error_msg)
+            
+            if predictions:
+                results = await self._get_writer().submit(predictions, wait=wait)
+                storage_stats['predictions_queued'] = len(predictions)
+                
+                stored_stocks = []
+                failures = set()
+                for stock, result in zip(prediction_stocks, results):
+                    if isinstance(result, Exception):
+                        failures.add(str(result))
                         continue
-                    
-                    # Process predictions for each stock
-                    for stock in stocks:
-                        try:
-                            prediction_id = await self._store_agent_stock_prediction(
-                                agent_id=agent_id,
-                                agent_data=agent_data,
-                                stock=stock,
-                                analysis_metadata=analysis_results.get('metadata', {})
-                            )
-                            
-                            if prediction_id:
-                                storage_stats['prediction_ids'].append(str(prediction_id))
-                                storage_stats['predictions_stored'] += 1
-                                storage_stats['instruments_processed'].add(stock)
-                        
-                        except Exception as e:
-                            error_msg = f"Failed to store prediction for {agent_name}/{stock}: {e}"
-                            logger.error(error_msg)
-                            storage_stats['errors'].append(error_msg)
-                    
-                    storage_stats['agents_processed'] += 1
+                    storage_stats['prediction_ids'].append(str(result))
+                    storage_stats['predictions_stored'] += 1
+                    stored_stocks.append(stock)
+                storage_stats['instruments_processed'] = list(dict.fromkeys(stored_stocks))
                 
-                except Exception as e:
-                    error_msg = f"Failed to process agent {agent_data.get('name', 'unknown')}: {e}"
+                for failure in failures:
+                    error_msg = f"Failed to store predictions: {failure}"
                     logger.error(error_msg)
                     storage_stats['errors'].append(error_msg)
             
-            # Convert set to list for JSON serialization
-            storage_stats['instruments_processed'] = list(storage_stats['instruments_processed'])
-            
             # Log summary
-            logger.info(f"Stored {storage_stats['predictions_stored']} predictions "
+            logger.info(f"Stored {storage_stats['predictions_stored']} "
+                       f"(queued {storage_stats['predictions_queued']}) predictions "
                        f"from {storage_stats['agents_processed']} agents "
                        f"for {len(storage_stats['instruments_processed'])} instruments")
             
@@ -148,222 +414,234 @@ class AgentDatabaseIntegrator:
             logger.error(f"Failed to store agent analysis results: {e}")
             return {
                 'predictions_stored': 0,
+                'predictions_queued': 0,
                 'agents_processed': 0,
                 'instruments_processed': [],
                 'prediction_ids': [],
                 'errors': [str(e)]
             }
     
-    async def _store_agent_stock_prediction(self, agent_id: uuid.UUID,
-                                          agent_data: Dict[str, Any],
-                                          stock: str,
-                                          analysis_metadata: Dict[str, Any]) -> Optional[uuid.UUID]:
-        """Store individual agent prediction for a stock"""
-        try:
-            # Get or create instrument ID
-            instrument_id = await self._get_or_create_instrument_id(stock)
+    @staticmethod
+    def _agent_stock_data(agent_data: Dict[str, Any], stock: str) -> Dict[str, Any]:
+        """Extract agent-specific data for this stock"""
+        agent_stock_data = agent_data.get(stock, {})
+        if not agent_stock_data and len(agent_data.keys()) == 1:
+            # Handle case where stock data is directly in agent_data
+            agent_stock_data = agent_data
+        return agent_stock_data
+    
+    def _build_predictions_vectorized(self, pairs: List[Tuple[str, uuid.UUID, uuid.UUID, str, Dict[str, Any]]],
+                                      stock_context: Dict[str, Dict[str, Any]],
+                                      model_version: str) -> Tuple[List[AgentPrediction], List[str]]:
+        """Build predictions for large batches, coercing scalar fields column-wise with pandas"""
+        rows = [self._agent_stock_data(agent_data, stock) for _, _, _, stock, agent_data in pairs]
+        raw = pd.DataFrame(rows, index=range(len(rows)))
+        
+        def first_valid(field_name: str, parse) -> pd.Series:
+            # Earlier candidate keys win, matching the per-row priority order
+            result = pd.Series(np.nan, index=raw.index, dtype=object)
+            for key in SCALAR_FIELD_KEYS[field_name]:
+                if key in raw.columns:
+                    result = result.combine_first(parse(raw[key]))
+            return result
+        
+        def numeric(column: pd.Series) -> pd.Series:
+            # Non-finite values count as missing, as in _finite_float
+            return pd.to_numeric(column, errors='coerce').replace([np.inf, -np.inf], np.nan)
+        
+        def parsed(parser) -> Callable[[pd.Series], pd.Series]:
+            # Element-wise FIELD_PARSERS entry, unparseable values become NaN like the per-row skip
+            def parse_value(value: Any) -> Any:
+                try:
+                    return parser(value)
+                except (ValueError, TypeError):
+                    return np.nan
+            return lambda column: column.map(parse_value)
+        
+        def to_python(series: pd.Series) -> List[Any]:
+            return series.astype(object).where(series.notna(), None).tolist()
+        
+        signal = first_valid('signal', lambda c: c.astype(str).str.lower().map(_SIGNAL_MAP))
+        confidence = numeric(first_valid('confidence', numeric))
+        confidence = confidence.where(confidence > 1.0, confidence * 100).clip(0.0, 100.0)
+        
+        # Try to infer signal from confidence
+        inferred = pd.Series(
+            np.select([confidence > 70, confidence < 30], ['bullish', 'bearish'], 'neutral'),
+            index=raw.index
+        )
+        signal = signal.where(signal.notna() | confidence.isna(), inferred)
+        
+        target_price = to_python(numeric(first_valid('target_price', numeric)))
+        stop_loss = to_python(numeric(first_valid('stop_loss', numeric)))
+        position_size = to_python(numeric(first_valid('position_size_pct', numeric)))
+        horizon = first_valid('time_horizon_days', parsed(FIELD_PARSERS['time_horizon_days']))
+        horizon = horizon.fillna(30).astype(int).tolist()  # Default 30 days
+        
+        valid = (signal.notna() & confidence.notna()).tolist()
+        skipped = len(valid) - sum(valid)
+        if skipped:
+            logger.warning(f"Missing signal or confidence for {skipped} of {len(valid)} predictions")
+        
+        signal = signal.tolist()
+        confidence = confidence.tolist()
+        
+        predictions = []
+        prediction_stocks = []
+        for i, (_, agent_id, instrument_id, stock, _) in enumerate(pairs):
+            if not valid[i]:
+                continue
             
-            # Extract agent-specific data for this stock
-            agent_stock_data = agent_data.get(stock, {})
-            if not agent_stock_data and len(agent_data.keys()) == 1:
-                # Handle case where stock data is directly in agent_data
-                agent_stock_data = agent_data
+            data = rows[i]
+            reasoning = {k: v for k, v in data.items() if k in REASONING_KEYS}
+            reasoning['source_hash'] = _source_hash(data)
+            context = stock_context[stock]
             
-            # Extract signal and confidence
-            signal = self._extract_signal(agent_stock_data)
-            confidence = self._extract_confidence(agent_stock_data)
+            predictions.append(AgentPrediction(
+                agent_id=agent_id,
+                instrument_id=instrument_id,
+                signal=signal[i],
+                confidence=float(confidence[i]),
+                reasoning=reasoning,
+                market_conditions=context['market'],
+                financial_metrics={k: v for k, v in data.items() if k in FINANCIAL_KEYS and v is not None},
+                price_data=context['price'],
+                target_price=target_price[i],
+                stop_loss=stop_loss[i],
+                time_horizon_days=horizon[i],
+                position_size_pct=position_size[i],
+                model_version=model_version,
+                feature_vector={k: v for k, v in data.items() if k in FEATURE_KEYS and v is not None},
+                external_factors=context['external']
+            ))
+            prediction_stocks.append(stock)
+        
+        return predictions, prediction_stocks
+    
+    def _build_agent_stock_prediction(self, agent_id: uuid.UUID,
+                                      instrument_id: uuid.UUID,
+                                      agent_data: Dict[str, Any],
+                                      stock: str,
+                                      context: Dict[str, Any],
+                                      model_version: str) -> Tuple[Optional[AgentPrediction], Optional[str]]:
+        """Build individual agent prediction for a stock
+        
+        Returns (prediction, None) on success, (None, error) for malformed data and
+        (None, None) when the agent gave no usable signal for the stock.
+        """
+        agent_stock_data = self._agent_stock_data(agent_data, stock)
+        if not isinstance(agent_stock_data, dict):
+            return None, f"expected a dict of agent data, got {type(agent_stock_data).__name__}"
+        
+        # One malformed agent output must not cost the rest of the batch its predictions
+        try:
+            fields = self._extract_all(agent_stock_data)
             
-            if not signal or confidence is None:
+            if not fields.signal or fields.confidence is None:
                 logger.warning(f"Missing signal or confidence for {agent_data.get('name')}/{stock}")
-                return None
+                return None, None
             
-            # Build prediction object
             prediction = AgentPrediction(
                 agent_id=agent_id,
                 instrument_id=instrument_id,
-                signal=signal,
-                confidence=float(confidence),
-                reasoning=self._extract_reasoning(agent_stock_data),
-                market_conditions=self._extract_market_conditions(analysis_metadata, stock),
-                financial_metrics=self._extract_financial_metrics(agent_stock_data),
-                price_data=self._extract_price_data(analysis_metadata, stock),
-                target_price=self._extract_target_price(agent_stock_data),
-                stop_loss=self._extract_stop_loss(agent_stock_data),
-                time_horizon_days=self._extract_time_horizon(agent_stock_data),
-                position_size_pct=self._extract_position_size(agent_stock_data),
-                model_version=analysis_metadata.get('version', '1.0'),
-                feature_vector=self._extract_features(agent_stock_data),
-                external_factors=self._extract_external_factors(analysis_metadata)
+                signal=fields.signal,
+                confidence=float(fields.confidence),
+                reasoning=fields.reasoning,
+                market_conditions=context['market'],
+                financial_metrics=fields.financial_metrics,
+                price_data=context['price'],
+                target_price=fields.target_price,
+                stop_loss=fields.stop_loss,
+                time_horizon_days=fields.time_horizon_days,
+                position_size_pct=fields.position_size_pct,
+                model_version=model_version,
+                feature_vector=fields.feature_vector,
+                external_factors=context['external']
             )
-            
-            # Save to database
-            prediction_id = await self.db_manager.save_agent_prediction(prediction)
-            return prediction_id
-        
         except Exception as e:
-            logger.error(f"Failed to store prediction for {stock}: {e}")
-            return None
+            return None, str(e)
+        return prediction, None
     
-    def _extract_signal(self, agent_data: Dict[str, Any]) -> Optional[str]:
-        """Extract trading signal from agent data"""
-        # Look for signal in various possible locations
-        signal_keys = ['signal', 'recommendation', 'action', 'position']
+    def _extract_all(self, agent_data: Dict[str, Any]) -> ExtractedFields:
+        """Extract every prediction field from agent data in a single pass"""
+        fields = ExtractedFields()
+        ranks = {}
         
-        for key in signal_keys:
-            if key in agent_data:
-                signal = str(agent_data[key]).lower()
-                
-                # Normalize signal values
-                if signal in ['buy', 'bullish', 'long', 'positive']:
-                    return 'bullish'
-                elif signal in ['sell', 'bearish', 'short', 'negative']:
-                    return 'bearish'
-                elif signal in ['hold', 'neutral', 'wait']:
-                    return 'neutral'
+        for key, value in agent_data.items():
+            if key in REASONING_KEYS:
+                fields.reasoning[key] = value
+                continue
+            
+            if key in FINANCIAL_KEYS:
+                if value is not None:
+                    fields.financial_metrics[key] = value
+                continue
+            if key in FEATURE_KEYS:
+                if value is not None:
+                    fields.feature_vector[key] = value
+                continue
+            
+            slot = KEY_TO_FIELD.get(key)
+            if slot is None:
+                continue
+            field_name, rank = slot
+            if field_name in ranks and ranks[field_name] < rank:
+                continue  # A higher-priority key already filled this field
+            
+            try:
+                parsed = FIELD_PARSERS[field_name](value)
+            except (ValueError, TypeError):
+                continue
+            if parsed is not None:
+                setattr(fields, field_name, parsed)
+                ranks[field_name] = rank
         
-        # Try to infer from confidence and reasoning
-        confidence = self._extract_confidence(agent_data)
-        if confidence is not None:
-            if confidence > 70:
-                return 'bullish'  # Default high confidence to bullish
-            elif confidence < 30:
-                return 'bearish'
+        # Try to infer signal from confidence
+        if fields.signal is None and fields.confidence is not None:
+            if fields.confidence > 70:
+                fields.signal = 'bullish'  # Default high confidence to bullish
+            elif fields.confidence < 30:
+                fields.signal = 'bearish'
             else:
-                return 'neutral'
+                fields.signal = 'neutral'
         
-        return None
-    
-    def _extract_confidence(self, agent_data: Dict[str, Any]) -> Optional[float]:
-        """Extract confidence score from agent data"""
-        confidence_keys = ['confidence', 'confidence_score', 'certainty', 'probability']
+        if fields.time_horizon_days is None:
+            fields.time_horizon_days = 30  # Default 30 days
         
-        for key in confidence_keys:
-            if key in agent_data:
-                try:
-                    confidence = float(agent_data[key])
-                    # Normalize to 0-100 if needed
-                    if confidence <= 1.0:
-                        confidence *= 100
-                    return min(100.0, max(0.0, confidence))
-                except (ValueError, TypeError):
-                    continue
+        fields.reasoning['source_hash'] = _source_hash(agent_data)
         
-        return None
+        return fields
     
-    def _extract_reasoning(self, agent_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Extract reasoning/analysis from agent data"""
-        reasoning_keys = ['reasoning', 'analysis', 'rationale', 'explanation', 'details']
-        reasoning = {}
-        
-        for key in reasoning_keys:
-            if key in agent_data:
-                reasoning[key] = agent_data[key]
-        
-        # Include other relevant fields
-        for key, value in agent_data.items():
-            if key not in ['signal', 'confidence', 'target_price', 'stop_loss']:
-                reasoning[key] = value
-        
-        return reasoning
-    
-    def _extract_market_conditions(self, metadata: Dict[str, Any], stock: str) -> Dict[str, Any]:
+    def _extract_market_conditions(self, metadata: Dict[str, Any], stock: str) -> Optional[Dict[str, Any]]:
         """Extract market conditions from analysis metadata"""
-        return {
+        return _dict_or_none({
             'timestamp': metadata.get('timestamp'),
             'market_session': metadata.get('market_session'),
             'volatility': metadata.get('market_volatility'),
             'sector_performance': metadata.get('sector_performance', {}).get(stock),
             'market_trend': metadata.get('market_trend')
-        }
-    
-    def _extract_financial_metrics(self, agent_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Extract financial metrics from agent data"""
-        financial_keys = ['pe_ratio', 'pb_ratio', 'debt_to_equity', 'roe', 'revenue_growth',
-                         'earnings_growth', 'current_ratio', 'quick_ratio', 'gross_margin']
-        
-        return {key: agent_data.get(key) for key in financial_keys 
-                if agent_data.get(key) is not None}
+        })
     
-    def _extract_price_data(self, metadata: Dict[str, Any], stock: str) -> Dict[str, Any]:
+    def _extract_price_data(self, metadata: Dict[str, Any], stock: str) -> Optional[Dict[str, Any]]:
         """Extract price data from metadata"""
         price_data = metadata.get('price_data', {}).get(stock, {})
-        return {
+        return _dict_or_none({
             'current_price': price_data.get('current_price'),
             'previous_close': price_data.get('previous_close'),
             'day_high': price_data.get('day_high'),
             'day_low': price_data.get('day_low'),
             'volume': price_data.get('volume'),
             'avg_volume': price_data.get('avg_volume')
-        }
-    
-    def _extract_target_price(self, agent_data: Dict[str, Any]) -> Optional[float]:
-        """Extract target price from agent data"""
-        target_keys = ['target_price', 'price_target', 'target']
-        
-        for key in target_keys:
-            if key in agent_data:
-                try:
-                    return float(agent_data[key])
-                except (ValueError, TypeError):
-                    continue
-        
-        return None
-    
-    def _extract_stop_loss(self, agent_data: Dict[str, Any]) -> Optional[float]:
-        """Extract stop loss from agent data"""
-        stop_keys = ['stop_loss', 'stop_price', 'risk_limit']
-        
-        for key in stop_keys:
-            if key in agent_data:
-                try:
-                    return float(agent_data[key])
-                except (ValueError, TypeError):
-                    continue
-        
-        return None
-    
-    def _extract_time_horizon(self, agent_data: Dict[str, Any]) -> int:
-        """Extract time horizon from agent data"""
-        horizon_keys = ['time_horizon', 'horizon_days', 'holding_period']
-        
-        for key in horizon_keys:
-            if key in agent_data:
-                try:
-                    return int(agent_data[key])
-                except (ValueError, TypeError):
-                    continue
-        
-        return 30  # Default 30 days
-    
-    def _extract_position_size(self, agent_data: Dict[str, Any]) -> Optional[float]:
-        """Extract position size percentage from agent data"""
-        size_keys = ['position_size', 'allocation', 'weight']
-        
-        for key in size_keys:
-            if key in agent_data:
-                try:
-                    return float(agent_data[key])
-                except (ValueError, TypeError):
-                    continue
-        
-        return None
-    
-    def _extract_features(self, agent_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Extract technical/fundamental features from agent data"""
-        feature_keys = ['sma_10', 'sma_50', 'rsi', 'macd', 'bollinger_bands',
-                       'volume_ratio', 'beta', 'volatility']
-        
-        return {key: agent_data.get(key) for key in feature_keys 
-                if agent_data.get(key) is not None}
+        })
     
-    def _extract_external_factors(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    def _extract_external_factors(self, metadata: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Extract external factors from metadata"""
-        return {
+        return _dict_or_none({
             'news_sentiment': metadata.get('news_sentiment'),
             'market_sentiment': metadata.get('market_sentiment'),
             'economic_indicators': metadata.get('economic_indicators'),
             'sector_rotation': metadata.get('sector_rotation')
-        }
+        })
     
     async def get_agent_performance_summary(self, days_back: int = 30) -> Dict[str, Any]:
         """Get performance summary for all agents"""
@@ -390,8 +668,11 @@ class AgentDatabaseIntegrator:
             return {'error': str(e)}
     
     async def close(self):
-        """Close database connections"""
-        if self.db_manager:
+        """Flush pending predictions and close database connections we opened"""
+        if self._writer:
+            await self._writer.close()
+            self._writer = None
+        if self.db_manager and self._owns_db_manager:
             await self.db_manager.close()
 
 # ============================================================================
@@ -400,7 +681,7 @@ class AgentDatabaseIntegrator:
 
 async def store_analysis_results(analysis_results: Dict[str, Any]) -> Dict[str, Any]:
     """Convenience function to store analysis results"""
-    integrator = AgentDatabaseIntegrator()
+    integrator = AgentDatabaseIntegrator(await get_db())
     try:
         await integrator.initialize()
         return await integrator.store_agent_analysis_results(analysis_results)
@@ -409,7 +690,7 @@ async def store_analysis_results(analysis_results: Dict[str, Any]) -> Dict[str,
 
 async def get_performance_dashboard() -> Dict[str, Any]:
     """Convenience function to get performance dashboard data"""
-    integrator = AgentDatabaseIntegrator()
+    integrator = AgentDatabaseIntegrator(await get_db())
     try:
         await integrator.initialize()
         return await integrator.get_agent_performance_summary()
@@ -466,4 +747,4 @@ async def example_usage():
     print(f"Performance dashboard: {dashboard}")
 
 if __name__ == "__main__":
-    asyncio.run(example_usage())
+    run_async(example_usage())
@@ -4,23 +4,224 @@ Handles PostgreSQL database connections and operations for the self-improving ML
 """
 
 import os
+import sys
 import asyncio
 import logging
+import time
 from datetime import datetime, date
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Tuple, Union, AsyncIterator, Iterable
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from decimal import Decimal
 import json
 import uuid
 
 import asyncpg
 import pandas as pd
-from pydantic import BaseModel, UUID4
+from pydantic import UUID4
 from contextlib import asynccontextmanager
 
+# JSONB codec registered on every pooled connection. Always binary so COPY
+# (which only speaks the binary protocol) works; orjson is used when available
+try:
+    import orjson
+    
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+    
+    def _json_bytes(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=json_serializer, option=_ORJSON_OPTIONS)
+    
+    def _json_loads(data: bytes) -> Any:
+        return orjson.loads(data)
+except ImportError:
+    def _json_bytes(obj: Any) -> bytes:
+        return json.dumps(obj, default=json_serializer).encode()
+    
+    def _json_loads(data: bytes) -> Any:
+        return json.loads(bytes(data))
+
+def _jsonb_encode(obj: Any) -> bytes:
+    # Binary jsonb is the JSON text prefixed with a format version byte
+    return b'\x01' + _json_bytes(obj)
+
+def _jsonb_decode(data: bytes) -> Any:
+    return _json_loads(data[1:])
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Column order shared by the single-row and batched prediction inserts
+PREDICTION_COLUMNS = (
+    'agent_id', 'instrument_id', 'signal', 'confidence', 'reasoning',
+    'market_conditions', 'financial_metrics', 'price_data',
+    'target_price', 'stop_loss', 'time_horizon_days', 'position_size_pct',
+    'model_version', 'feature_vector', 'external_factors'
+)
+
+# Postgres element types for binding each column as an array in batched inserts
+PREDICTION_ARRAY_TYPES = (
+    'uuid', 'uuid', 'varchar', 'numeric', 'jsonb',
+    'jsonb', 'jsonb', 'jsonb',
+    'numeric', 'numeric', 'int', 'numeric',
+    'varchar', 'jsonb', 'jsonb'
+)
+
+OUTCOME_COLUMNS = (
+    'prediction_id', 'actual_signal', 'actual_price_change', 'actual_return',
+    'max_favorable_move', 'max_adverse_move', 'is_correct', 'accuracy_score',
+    'return_score', 'risk_adjusted_return', 'sharpe_ratio', 'days_to_target',
+    'early_exit_reason'
+)
+OUTCOME_ARRAY_TYPES = (
+    'uuid', 'varchar', 'numeric', 'numeric',
+    'numeric', 'numeric', 'boolean', 'numeric',
+    'numeric', 'numeric', 'numeric', 'int',
+    'varchar'
+)
+
+INSERT_PREDICTION_SQL = f"""
+INSERT INTO agent_predictions ({', '.join(PREDICTION_COLUMNS)})
+VALUES ({', '.join(f'${i}' for i in range(1, len(PREDICTION_COLUMNS) + 1))})
+RETURNING id
+"""
+
+# Batches larger than this are staged with COPY instead of a single unnest() insert
+COPY_THRESHOLD = 1000
+
+# Optional WAL-free landing table for batched predictions, merged periodically.
+# LIKE does not copy foreign keys, so they are declared again to reject bad
+# agent/instrument IDs at staging time rather than at merge time
+PREDICTION_STAGING_TABLE = 'agent_predictions_staging'
+PREDICTION_REJECTED_TABLE = 'agent_predictions_rejected'
+PREDICTION_STAGING_DDL = f"""
+CREATE UNLOGGED TABLE IF NOT EXISTS {PREDICTION_STAGING_TABLE} (
+    LIKE agent_predictions INCLUDING DEFAULTS INCLUDING CONSTRAINTS,
+    FOREIGN KEY (agent_id) REFERENCES agents(id),
+    FOREIGN KEY (instrument_id) REFERENCES instruments(id)
+);
+CREATE TABLE IF NOT EXISTS {PREDICTION_REJECTED_TABLE} (
+    LIKE agent_predictions INCLUDING DEFAULTS,
+    rejected_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+"""
+_STAGED_COLUMNS = ', '.join(('id', 'prediction_timestamp', 'status', 'created_at') + PREDICTION_COLUMNS)
+# Rows whose agent or instrument no longer exists (e.g. staged before the foreign
+# keys above were added) are quarantined so they cannot wedge every later merge
+_STAGED_ROW_IS_VALID = (
+    "EXISTS (SELECT 1 FROM agents a WHERE a.id = moved.agent_id) "
+    "AND EXISTS (SELECT 1 FROM instruments i WHERE i.id = moved.instrument_id)"
+)
+MERGE_STAGED_PREDICTIONS_SQL = f"""
+WITH moved AS (DELETE FROM {PREDICTION_STAGING_TABLE} RETURNING *),
+merged AS (
+    INSERT INTO agent_predictions ({_STAGED_COLUMNS})
+    SELECT {_STAGED_COLUMNS} FROM moved WHERE {_STAGED_ROW_IS_VALID}
+    RETURNING 1
+),
+rejected AS (
+    INSERT INTO {PREDICTION_REJECTED_TABLE} ({_STAGED_COLUMNS})
+    SELECT {_STAGED_COLUMNS} FROM moved WHERE NOT ({_STAGED_ROW_IS_VALID})
+    RETURNING 1
+)
+SELECT (SELECT COUNT(*) FROM merged) AS merged, (SELECT COUNT(*) FROM rejected) AS rejected
+"""
+
+# Pre-aggregated agent leaderboard (see database/schema.sql) and the window it covers
+AGENT_PERF_VIEW = 'mv_agent_perf'
+AGENT_PERF_VIEW_DAYS = 30
+
+AGENT_PREDICTIONS_SQL = """
+SELECT ap.*, i.ticker, i.name as instrument_name,
+       po.actual_return, po.is_correct, po.accuracy_score
+FROM agent_predictions ap
+JOIN instruments i ON ap.instrument_id = i.id
+LEFT JOIN prediction_outcomes po ON ap.id = po.prediction_id
+WHERE ap.agent_id = $1
+  AND ap.prediction_timestamp >= NOW() - ($3::int * INTERVAL '1 day')
+ORDER BY ap.prediction_timestamp DESC
+LIMIT $2
+"""
+CURSOR_PREFETCH = 500
+
+# Remaining fixed queries, kept at module level so every call reuses the same text
+REQUIRED_TABLE_COUNT_SQL = """
+SELECT COUNT(*) FROM information_schema.tables 
+WHERE table_schema = 'public' 
+AND table_name IN ('agents', 'instruments', 'agent_predictions')
+"""
+
+ACTIVE_AGENT_COUNT_SQL = "SELECT COUNT(*) FROM agents WHERE is_active = true"
+
+ACTIVE_AGENTS_SQL = "SELECT * FROM agents WHERE is_active = true ORDER BY display_name"
+
+INSTRUMENTS_BY_TICKER_SQL = "SELECT * FROM instruments WHERE ticker = ANY($1::text[])"
+
+# The no-op DO UPDATE makes RETURNING include rows created concurrently
+UPSERT_INSTRUMENTS_SQL = """
+INSERT INTO instruments (ticker, name, market, currency)
+SELECT * FROM unnest($1::text[], $2::text[], $3::text[], $4::text[])
+ON CONFLICT (ticker) DO UPDATE SET ticker = EXCLUDED.ticker
+RETURNING *
+"""
+
+INSERT_OUTCOME_SQL = """
+INSERT INTO prediction_outcomes (
+    prediction_id, actual_signal, actual_price_change, actual_return,
+    max_favorable_move, max_adverse_move, is_correct, accuracy_score,
+    return_score, risk_adjusted_return, sharpe_ratio, days_to_target,
+    early_exit_reason
+) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13)
+RETURNING id
+"""
+
+TOP_AGENTS_FROM_VIEW_SQL = f"""
+SELECT *,
+       ROW_NUMBER() OVER (ORDER BY accuracy_rate DESC, avg_return DESC) as rank
+FROM {AGENT_PERF_VIEW}
+ORDER BY accuracy_rate DESC, avg_return DESC
+LIMIT $1
+"""
+
+TOP_AGENTS_LIVE_SQL = """
+WITH agent_stats AS (
+    SELECT 
+        a.id,
+        a.name,
+        a.display_name,
+        a.type,
+        COUNT(po.id) as total_predictions,
+        AVG(CASE WHEN po.is_correct THEN 100.0 ELSE 0.0 END) as accuracy_rate,
+        AVG(po.return_score) as avg_return,
+        AVG(po.risk_adjusted_return) as avg_risk_adj_return
+    FROM agents a
+    JOIN agent_predictions ap ON a.id = ap.agent_id
+    LEFT JOIN prediction_outcomes po ON ap.id = po.prediction_id
+    WHERE ap.prediction_timestamp >= NOW() - ($2::int * INTERVAL '1 day')
+      AND po.id IS NOT NULL
+      AND a.is_active = true
+    GROUP BY a.id, a.name, a.display_name, a.type
+    HAVING COUNT(po.id) >= 5  -- Minimum predictions for ranking
+)
+SELECT *,
+       ROW_NUMBER() OVER (ORDER BY accuracy_rate DESC, avg_return DESC) as rank
+FROM agent_stats
+ORDER BY accuracy_rate DESC, avg_return DESC
+LIMIT $1
+"""
+
+INSERT_SYSTEM_HEALTH_SQL = """
+INSERT INTO system_health (component, status, metrics, error_message)
+VALUES ($1, $2, $3, $4)
+"""
+
+SYSTEM_HEALTH_STATUS_SQL = """
+SELECT component, status, metrics, error_message, health_timestamp
+FROM system_health
+WHERE health_timestamp >= NOW() - ($1::int * INTERVAL '1 hour')
+ORDER BY health_timestamp DESC
+"""
+
 class DatabaseConfig:
     """Database configuration from environment variables"""
     
@@ -35,6 +236,22 @@ class DatabaseConfig:
         self.username = os.getenv('DB_USER', 'ai_hedge_fund_user')
         self.password = os.getenv('DB_PASSWORD', 'ai_hedge_fund_secure_password_2025')
         
+        # Connection pool sizing, shared by every caller of the manager.
+        # DB_POOL_MIN/DB_POOL_MAX are the documented names; the *_SIZE spellings still work
+        self.pool_min_size = int(os.getenv('DB_POOL_MIN') or os.getenv('DB_POOL_MIN_SIZE') or 10)
+        self.pool_max_size = int(os.getenv('DB_POOL_MAX') or os.getenv('DB_POOL_MAX_SIZE') or 50)
+        
+        # Stage batched predictions in an UNLOGGED table; trades a short
+        # durability window (until the next merge) for cheaper ingest
+        self.prediction_staging = os.getenv('DB_PREDICTION_STAGING', 'false').lower() == 'true'
+        self.staging_merge_interval = float(os.getenv('DB_PREDICTION_STAGING_MERGE_SECONDS', 5))
+        
+        # Minimum age of the agent leaderboard view before a read triggers a refresh
+        self.perf_view_refresh_interval = float(os.getenv('DB_PERF_VIEW_REFRESH_SECONDS', 300))
+        
+        # How long agent and instrument lookups are served from memory
+        self.lookup_cache_ttl = float(os.getenv('DB_LOOKUP_CACHE_TTL_SECONDS', 300))
+        
     @property
     def connection_string(self) -> str:
         if self.database_url:
@@ -42,25 +259,78 @@ class DatabaseConfig:
         else:
             return f"postgresql://{self.username}:{self.password}@{self.host}:{self.port}/{self.database}"
 
-class AgentPrediction(BaseModel):
+# Slotted dataclasses where supported (Python 3.10+)
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+# Mirrors the CHECK constraints on agent_predictions/prediction_outcomes in database/schema.sql
+VALID_SIGNALS = frozenset(('bullish', 'bearish', 'neutral'))
+
+def _as_uuid(value: Any, name: str) -> uuid.UUID:
+    """Coerce a UUID or UUID string, raising ValueError otherwise"""
+    if isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        raise ValueError(f"{name} must be a UUID, got {value!r}") from None
+
+def _as_float(value: Any, name: str) -> Optional[float]:
+    """Coerce an optional number to float, raising ValueError otherwise"""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number, got {value!r}") from None
+
+def _as_int(value: Any, name: str) -> Optional[int]:
+    """Coerce an optional whole number to int, rejecting fractions like 30.5"""
+    number = _as_float(value, name)
+    if number is None:
+        return None
+    if not number.is_integer():
+        raise ValueError(f"{name} must be a whole number, got {value!r}")
+    return int(number)
+
+def _check_signal(value: Any, name: str) -> None:
+    """Raise ValueError unless value is a canonical signal"""
+    if value not in VALID_SIGNALS:
+        raise ValueError(f"{name} must be one of {sorted(VALID_SIGNALS)}, got {value!r}")
+
+@dataclass(**_SLOTS)
+class AgentPrediction:
     """Agent prediction data model"""
     agent_id: UUID4
     instrument_id: UUID4
     signal: str  # 'bullish', 'bearish', 'neutral'
     confidence: float  # 0-100
     reasoning: Dict[str, Any]
-    market_conditions: Optional[Dict[str, Any]] = {}
-    financial_metrics: Optional[Dict[str, Any]] = {}
-    price_data: Optional[Dict[str, Any]] = {}
+    market_conditions: Optional[Dict[str, Any]] = field(default_factory=dict)
+    financial_metrics: Optional[Dict[str, Any]] = field(default_factory=dict)
+    price_data: Optional[Dict[str, Any]] = field(default_factory=dict)
     target_price: Optional[float] = None
     stop_loss: Optional[float] = None
     time_horizon_days: int = 30
     position_size_pct: Optional[float] = None
     model_version: Optional[str] = None
-    feature_vector: Optional[Dict[str, Any]] = {}
-    external_factors: Optional[Dict[str, Any]] = {}
+    feature_vector: Optional[Dict[str, Any]] = field(default_factory=dict)
+    external_factors: Optional[Dict[str, Any]] = field(default_factory=dict)
     
-class PredictionOutcome(BaseModel):
+    def __post_init__(self):
+        """Validate and coerce fields the database would otherwise reject"""
+        self.agent_id = _as_uuid(self.agent_id, 'agent_id')
+        self.instrument_id = _as_uuid(self.instrument_id, 'instrument_id')
+        _check_signal(self.signal, 'signal')
+        self.confidence = _as_float(self.confidence, 'confidence')
+        if self.confidence is None or not 0.0 <= self.confidence <= 100.0:
+            raise ValueError(f"confidence must be between 0 and 100, got {self.confidence!r}")
+        self.target_price = _as_float(self.target_price, 'target_price')
+        self.stop_loss = _as_float(self.stop_loss, 'stop_loss')
+        self.time_horizon_days = _as_int(self.time_horizon_days, 'time_horizon_days')
+        self.position_size_pct = _as_float(self.position_size_pct, 'position_size_pct')
+
+@dataclass(**_SLOTS)
+class PredictionOutcome:
     """Prediction outcome data model"""
     prediction_id: UUID4
     actual_signal: Optional[str] = None
@@ -75,6 +345,166 @@ class PredictionOutcome(BaseModel):
     sharpe_ratio: Optional[float] = None
     days_to_target: Optional[int] = None
     early_exit_reason: Optional[str] = None
+    
+    def __post_init__(self):
+        """Validate and coerce fields the database would otherwise reject"""
+        self.prediction_id = _as_uuid(self.prediction_id, 'prediction_id')
+        if self.actual_signal is not None:
+            _check_signal(self.actual_signal, 'actual_signal')
+        for name in ('actual_price_change', 'actual_return', 'max_favorable_move', 'max_adverse_move',
+                     'accuracy_score', 'return_score', 'risk_adjusted_return', 'sharpe_ratio'):
+            setattr(self, name, _as_float(getattr(self, name), name))
+        if self.is_correct is not None:
+            self.is_correct = bool(self.is_correct)
+        self.days_to_target = _as_int(self.days_to_target, 'days_to_target')
+
+# Headline metrics (same formulas as the calculate_agent_performance SQL function)
+# and distribution stats, aggregated in one scan of the evaluated predictions
+AGENT_PERFORMANCE_SQL = """
+WITH prediction_stats AS (
+    SELECT 
+        ap.signal,
+        ap.confidence,
+        po.is_correct,
+        po.return_score,
+        po.risk_adjusted_return,
+        po.days_to_target
+    FROM agent_predictions ap
+    JOIN prediction_outcomes po ON ap.id = po.prediction_id
+    WHERE ap.agent_id = $1
+      AND ap.prediction_timestamp::date BETWEEN $2 AND $3
+      AND ($4::uuid IS NULL OR ap.instrument_id = $4)
+)
+SELECT 
+    ROUND(AVG(CASE WHEN is_correct THEN 100.0 ELSE 0.0 END), 2) as accuracy_rate,
+    ROUND(AVG(return_score), 4) as total_return,
+    ROUND(
+        CASE 
+            WHEN STDDEV(return_score) > 0 
+            THEN AVG(return_score) / STDDEV(return_score)
+            ELSE 0 
+        END, 4
+    ) as sharpe_ratio,
+    ROUND(AVG(CASE WHEN return_score > 0 THEN 100.0 ELSE 0.0 END), 2) as win_rate,
+    COUNT(*) as total_predictions,
+    AVG(confidence) as avg_confidence,
+    STDDEV(COALESCE(return_score, 0)) as return_volatility,
+    MAX(return_score) as best_return,
+    MIN(return_score) as worst_return,
+    AVG(days_to_target) as avg_days_to_target,
+    COUNT(CASE WHEN signal = 'bullish' THEN 1 END) as bullish_predictions,
+    COUNT(CASE WHEN signal = 'bearish' THEN 1 END) as bearish_predictions,
+    COUNT(CASE WHEN signal = 'neutral' THEN 1 END) as neutral_predictions
+FROM prediction_stats
+"""
+
+# Typed feature_store columns; anything else goes into custom_features
+FEATURE_COLUMNS = (
+    'sma_10', 'sma_50', 'sma_200', 'rsi_14', 'macd',
+    'bollinger_upper', 'bollinger_lower', 'volume_ratio',
+    'pe_ratio', 'pb_ratio', 'roe', 'debt_to_equity', 'current_ratio',
+    'revenue_growth', 'earnings_growth',
+    'news_sentiment', 'social_sentiment', 'insider_activity_score', 'analyst_rating_avg',
+    'market_beta', 'correlation_spy', 'sector_performance', 'volatility_30d'
+)
+FEATURE_COLUMN_SET = frozenset(FEATURE_COLUMNS)
+
+# One statement for every feature combination: missing values arrive as NULL and
+# leave the stored value untouched on conflict
+_CUSTOM_FEATURES_PARAM = f'${len(FEATURE_COLUMNS) + 3}'
+_FEATURE_UPDATE_SET = ', '.join(f'{col} = COALESCE(EXCLUDED.{col}, feature_store.{col})' for col in FEATURE_COLUMNS)
+UPSERT_FEATURES_SQL = f"""
+INSERT INTO feature_store (instrument_id, feature_timestamp, {', '.join(FEATURE_COLUMNS)}, custom_features)
+VALUES ($1, $2, {', '.join(f'${i}' for i in range(3, len(FEATURE_COLUMNS) + 3))},
+        COALESCE({_CUSTOM_FEATURES_PARAM}::jsonb, '{{}}'::jsonb))
+ON CONFLICT (instrument_id, feature_timestamp)
+DO UPDATE SET {_FEATURE_UPDATE_SET},
+    custom_features = COALESCE({_CUSTOM_FEATURES_PARAM}::jsonb, feature_store.custom_features)
+"""
+
+# Backfill path: rows are COPYed into this transaction-scoped table, then upserted
+# with the same semantics as UPSERT_FEATURES_SQL
+FEATURE_BATCH_TABLE = 'feature_store_batch'
+_FEATURE_BATCH_COLUMNS = ('instrument_id', 'feature_timestamp') + FEATURE_COLUMNS + ('custom_features',)
+CREATE_FEATURE_BATCH_SQL = f"""
+CREATE TEMP TABLE {FEATURE_BATCH_TABLE} ON COMMIT DROP AS
+SELECT {', '.join(_FEATURE_BATCH_COLUMNS)} FROM feature_store WITH NO DATA
+"""
+MERGE_FEATURE_BATCH_SQL = f"""
+INSERT INTO feature_store ({', '.join(_FEATURE_BATCH_COLUMNS)})
+SELECT instrument_id, feature_timestamp, {', '.join(FEATURE_COLUMNS)},
+       COALESCE(custom_features, '{{}}'::jsonb)
+FROM {FEATURE_BATCH_TABLE}
+ON CONFLICT (instrument_id, feature_timestamp)
+DO UPDATE SET {_FEATURE_UPDATE_SET},
+    custom_features = COALESCE(NULLIF(EXCLUDED.custom_features, '{{}}'::jsonb), feature_store.custom_features)
+"""
+
+AGENT_BY_NAME_SQL = "SELECT * FROM agents WHERE name = $1 AND is_active = true"
+
+INSTRUMENT_BY_TICKER_SQL = "SELECT * FROM instruments WHERE ticker = $1 AND is_active = true"
+
+# The no-op DO UPDATE makes RETURNING yield the id of an existing row too;
+# xmax = 0 only for a freshly inserted tuple
+UPSERT_INSTRUMENT_SQL = """
+INSERT INTO instruments (ticker, name, market, currency, sector)
+VALUES ($1, $2, $3, $4, $5)
+ON CONFLICT (ticker) DO UPDATE SET ticker = EXCLUDED.ticker
+RETURNING *, (xmax = 0) AS inserted
+"""
+
+_MISSING = object()
+
+class TTLCache:
+    """Size-bounded LRU mapping whose entries expire after a fixed TTL"""
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()  # key -> (value, expires_at)
+    
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Return a live entry, refreshing its LRU position"""
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return default
+        
+        self._data.move_to_end(key)
+        return value
+    
+    def __contains__(self, key: Any) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+    
+    def __setitem__(self, key: Any, value: Any):
+        self._data[key] = (value, time.monotonic() + self.ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+    
+    def update(self, items: Dict[Any, Any]):
+        for key, value in items.items():
+            self[key] = value
+    
+    def clear(self):
+        self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
+
+# Agent cache key for the active-agent list; cannot collide with an agent name
+_ACTIVE_AGENTS_KEY = ('active_agents',)
+
+async def _init_connection(conn: asyncpg.Connection):
+    """Register the JSONB codec on each new pooled connection"""
+    await conn.set_type_codec(
+        'jsonb', schema='pg_catalog', format='binary',
+        encoder=_jsonb_encode, decoder=_jsonb_decode
+    )
 
 class DatabaseManager:
     """Main database manager for AI Hedge Fund platform"""
@@ -82,6 +512,13 @@ class DatabaseManager:
     def __init__(self, config: Optional[DatabaseConfig] = None):
         self.config = config or DatabaseConfig()
         self._pool: Optional[asyncpg.Pool] = None
+        self._merge_task: Optional[asyncio.Task] = None
+        self._perf_view_task: Optional[asyncio.Task] = None
+        self._perf_view_refreshed_at: Optional[float] = None
+        
+        # Agents and instruments change rarely; memoize the hot lookups
+        self._agent_cache = TTLCache(maxsize=128, ttl=self.config.lookup_cache_ttl)
+        self._instrument_cache = TTLCache(maxsize=1024, ttl=self.config.lookup_cache_ttl)
         
     async def initialize(self):
         """Initialize database connection pool"""
@@ -92,9 +529,13 @@ class DatabaseManager:
             
             self._pool = await asyncpg.create_pool(
                 connection_string,
-                min_size=2,
-                max_size=10,
-                command_timeout=60
+                min_size=self.config.pool_min_size,
+                max_size=self.config.pool_max_size,
+                max_inactive_connection_lifetime=300,
+                max_queries=50000,  # Recycle long-lived connections
+                statement_cache_size=1024,  # asyncpg prepares and caches the SQL constants per connection
+                command_timeout=60,
+                init=_init_connection
             )
             logger.info("Database connection pool initialized successfully.")
             
@@ -103,12 +544,40 @@ class DatabaseManager:
                 result = await conn.fetchval("SELECT version()")
                 logger.info(f"Connected to PostgreSQL: {result}")
                 
+                if self.config.prediction_staging:
+                    await conn.execute(PREDICTION_STAGING_DDL)
+            
+            if self.config.prediction_staging:
+                self._merge_task = asyncio.create_task(self._merge_staged_predictions_loop())
+                logger.info(f"Staging predictions in {PREDICTION_STAGING_TABLE}, "
+                            f"merging every {self.config.staging_merge_interval}s")
+                
         except Exception as e:
             logger.error(f"Failed to initialize database connection: {e}")
             raise
     
     async def close(self):
         """Close database connection pool"""
+        if self._perf_view_task and not self._perf_view_task.done():
+            self._perf_view_task.cancel()
+            try:
+                await self._perf_view_task
+            except asyncio.CancelledError:
+                pass
+        
+        if self._merge_task:
+            self._merge_task.cancel()
+            try:
+                await self._merge_task
+            except asyncio.CancelledError:
+                pass
+            self._merge_task = None
+            # Final merge so nothing is left only in the unlogged table
+            try:
+                await self.merge_staged_predictions()
+            except Exception as e:
+                logger.error(f"Failed to merge staged predictions on close: {e}")
+        
         if self._pool:
             await self._pool.close()
             logger.info("Database connection pool closed.")
@@ -128,21 +597,22 @@ class DatabaseManager:
                 await conn.fetchval("SELECT 1")
                 
                 # Check if required tables exist
-                tables_query = """
-                SELECT COUNT(*) FROM information_schema.tables 
-                WHERE table_schema = 'public' 
-                AND table_name IN ('agents', 'instruments', 'agent_predictions')
-                """
-                table_count = await conn.fetchval(tables_query)
+                table_count = await conn.fetchval(REQUIRED_TABLE_COUNT_SQL)
                 
                 # Check agent count
-                agent_count = await conn.fetchval("SELECT COUNT(*) FROM agents WHERE is_active = true")
+                agent_count = await conn.fetchval(ACTIVE_AGENT_COUNT_SQL)
                 
                 return {
                     "connected": True,
                     "tables_exist": table_count >= 3,
                     "agent_count": agent_count,
-                    "expected_agents": 17
+                    "expected_agents": 17,
+                    "pool": {
+                        "size": self._pool.get_size(),
+                        "idle": self._pool.get_idle_size(),
+                        "min_size": self._pool.get_min_size(),
+                        "max_size": self._pool.get_max_size()
+                    }
                 }
                 
         except Exception as e:
@@ -158,11 +628,8 @@ class DatabaseManager:
         if not self._pool:
             raise RuntimeError("Database not initialized. Call initialize() first.")
         
-        conn = await self._pool.acquire()
-        try:
+        async with self._pool.acquire() as conn:
             yield conn
-        finally:
-            await self._pool.release(conn)
     
     # ============================================================================
     # AGENT MANAGEMENT
@@ -170,55 +637,108 @@ class DatabaseManager:
     
     async def get_agent_by_name(self, agent_name: str) -> Optional[Dict[str, Any]]:
         """Get agent information by name"""
+        agent = self._agent_cache.get(agent_name)
+        if agent is not None:
+            return agent
+        
         async with self.get_connection() as conn:
-            result = await conn.fetchrow(
-                "SELECT * FROM agents WHERE name = $1 AND is_active = true",
-                agent_name
-            )
-            return dict(result) if result else None
+            result = await conn.fetchrow(AGENT_BY_NAME_SQL, agent_name)
+        
+        if result is None:
+            return None
+        agent = self._agent_cache[agent_name] = dict(result)
+        return agent
     
     async def get_all_active_agents(self) -> List[Dict[str, Any]]:
         """Get all active agents"""
+        agents = self._agent_cache.get(_ACTIVE_AGENTS_KEY)
+        if agents is not None:
+            return agents
+        
         async with self.get_connection() as conn:
-            results = await conn.fetch(
-                "SELECT * FROM agents WHERE is_active = true ORDER BY display_name"
-            )
-            return [dict(row) for row in results]
+            results = await conn.fetch(ACTIVE_AGENTS_SQL)
+        
+        agents = self._agent_cache[_ACTIVE_AGENTS_KEY] = [dict(row) for row in results]
+        # Also warm the per-name entries get_agent_by_name reads
+        self._agent_cache.update({agent['name']: agent for agent in agents})
+        return agents
+    
+    def invalidate_agent_cache(self):
+        """Drop memoized agent and instrument lookups, e.g. after admin changes"""
+        self._agent_cache.clear()
+        self._instrument_cache.clear()
     
     async def get_instrument_by_ticker(self, ticker: str) -> Optional[Dict[str, Any]]:
         """Get instrument information by ticker"""
+        instrument = self._instrument_cache.get(ticker)
+        if instrument is not None:
+            return instrument
+        
         async with self.get_connection() as conn:
-            result = await conn.fetchrow(
-                "SELECT * FROM instruments WHERE ticker = $1 AND is_active = true",
-                ticker
-            )
-            return dict(result) if result else None
+            result = await conn.fetchrow(INSTRUMENT_BY_TICKER_SQL, ticker)
+        
+        if result is None:
+            return None
+        instrument = self._instrument_cache[ticker] = dict(result)
+        return instrument
     
     async def create_instrument_if_not_exists(self, ticker: str, name: str, 
                                            market: str = 'US', currency: str = 'USD',
                                            sector: Optional[str] = None) -> UUID4:
         """Create instrument if it doesn't exist, return UUID"""
+        cached = self._instrument_cache.get(ticker)
+        if cached is not None:
+            return cached['id']
+        
         async with self.get_connection() as conn:
-            # Check if exists
-            result = await conn.fetchrow(
-                "SELECT id FROM instruments WHERE ticker = $1", ticker
-            )
-            
-            if result:
-                return result['id']
-            
-            # Create new instrument
-            instrument_id = await conn.fetchval(
-                """
-                INSERT INTO instruments (ticker, name, market, currency, sector)
-                VALUES ($1, $2, $3, $4, $5)
-                RETURNING id
-                """,
+            row = await conn.fetchrow(
+                UPSERT_INSTRUMENT_SQL,
                 ticker, name, market, currency, sector
             )
+        
+        instrument = dict(row)
+        if instrument.pop('inserted'):
+            logger.info(f"Created new instrument: {ticker} ({instrument['id']})")
+        # Same entries get_instrument_by_ticker serves, so repeat calls skip the upsert
+        if instrument['is_active']:
+            self._instrument_cache[ticker] = instrument
+        return instrument['id']
+    
+    async def resolve_instrument_ids(self, instruments: List[Tuple[str, str, str, str]]) -> Dict[str, UUID4]:
+        """Map tickers to instrument IDs, creating missing ones, in at most two queries
+        
+        Each entry is a (ticker, name, market, currency) tuple.
+        """
+        instrument_ids = {}
+        uncached = []
+        for item in instruments:
+            cached = self._instrument_cache.get(item[0])
+            if cached is None:
+                uncached.append(item)
+            else:
+                instrument_ids[item[0]] = cached['id']
+        if not uncached:
+            return instrument_ids
+        
+        async with self.get_connection() as conn:
+            rows = await conn.fetch(INSTRUMENTS_BY_TICKER_SQL, [item[0] for item in uncached])
             
-            logger.info(f"Created new instrument: {ticker} ({instrument_id})")
-            return instrument_id
+            found = {row['ticker'] for row in rows}
+            missing = [item for item in uncached if item[0] not in found]
+            if missing:
+                created = await conn.fetch(
+                    UPSERT_INSTRUMENTS_SQL,
+                    *(list(column) for column in zip(*missing))
+                )
+                rows.extend(created)
+                logger.info(f"Created {len(created)} new instruments: {[item[0] for item in missing]}")
+        
+        for row in rows:
+            instrument_ids[row['ticker']] = row['id']
+            # Same entries get_instrument_by_ticker serves, which only sees active instruments
+            if row['is_active']:
+                self._instrument_cache[row['ticker']] = dict(row)
+        return instrument_ids
     
     # ============================================================================
     # PREDICTION MANAGEMENT
@@ -227,43 +747,143 @@ class DatabaseManager:
     async def save_agent_prediction(self, prediction: AgentPrediction) -> UUID4:
         """Save agent prediction to database"""
         async with self.get_connection() as conn:
-            prediction_id = await conn.fetchval(
-                """
-                INSERT INTO agent_predictions (
-                    agent_id, instrument_id, signal, confidence, reasoning,
-                    market_conditions, financial_metrics, price_data,
-                    target_price, stop_loss, time_horizon_days, position_size_pct,
-                    model_version, feature_vector, external_factors
-                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15)
-                RETURNING id
-                """,
-                prediction.agent_id, prediction.instrument_id, prediction.signal,
-                prediction.confidence, json.dumps(prediction.reasoning),
-                json.dumps(prediction.market_conditions), 
-                json.dumps(prediction.financial_metrics),
-                json.dumps(prediction.price_data), prediction.target_price,
-                prediction.stop_loss, prediction.time_horizon_days,
-                prediction.position_size_pct, prediction.model_version,
-                json.dumps(prediction.feature_vector),
-                json.dumps(prediction.external_factors)
-            )
+            prediction_id = await conn.fetchval(INSERT_PREDICTION_SQL, *self._prediction_record(prediction))
             
             logger.info(f"Saved prediction {prediction_id} for agent {prediction.agent_id}")
             return prediction_id
     
+    @staticmethod
+    def _prediction_record(prediction: AgentPrediction) -> tuple:
+        """Flatten a prediction into a row matching PREDICTION_COLUMNS"""
+        return (
+            prediction.agent_id, prediction.instrument_id, prediction.signal,
+            prediction.confidence, prediction.reasoning,
+            prediction.market_conditions, prediction.financial_metrics,
+            prediction.price_data, prediction.target_price,
+            prediction.stop_loss, prediction.time_horizon_days,
+            prediction.position_size_pct, prediction.model_version,
+            prediction.feature_vector, prediction.external_factors
+        )
+    
+    async def _insert_batch_returning_ids(self, table: str, columns: Tuple[str, ...],
+                                          array_types: Tuple[str, ...],
+                                          records: List[tuple],
+                                          copy_source: Optional[str] = None) -> List[UUID4]:
+        """Insert rows in one transaction and one statement, returning the ids in record order
+        
+        Small batches bind one array per column and unnest() them back into rows;
+        batches above COPY_THRESHOLD are COPYed into a temporary table
+        shaped like copy_source (defaults to table) and inserted from there.
+        """
+        column_list = ', '.join(columns)
+        
+        async with self.get_connection() as conn:
+            async with conn.transaction():
+                if len(records) > COPY_THRESHOLD:
+                    # COPY into a transaction-scoped staging table with an explicit ordinal
+                    await conn.execute(
+                        f"""
+                        CREATE TEMP TABLE {table}_batch ON COMMIT DROP AS
+                        SELECT 0::bigint AS ord, {column_list} FROM {copy_source or table} WITH NO DATA
+                        """
+                    )
+                    await conn.copy_records_to_table(
+                        f'{table}_batch',
+                        records=[(ordinal, *record) for ordinal, record in enumerate(records, 1)],
+                        columns=('ord',) + columns
+                    )
+                    source = f'{table}_batch'
+                    args = ()
+                else:
+                    # One array parameter per column; unnest() zips them back into rows
+                    arrays = ', '.join(f'${i}::{array_type}[]' for i, array_type in enumerate(array_types, 1))
+                    source = f'unnest({arrays}) WITH ORDINALITY AS batch ({column_list}, ord)'
+                    args = tuple(list(column) for column in zip(*records))
+                
+                # RETURNING order is not guaranteed for INSERT ... SELECT, so ids are
+                # drawn up front (the CTE is evaluated once) and read back by ordinal
+                rows = await conn.fetch(
+                    f"""
+                    WITH input AS (
+                        SELECT gen_random_uuid() AS id, ord, {column_list} FROM {source}
+                    ),
+                    inserted AS (
+                        INSERT INTO {table} (id, {column_list})
+                        SELECT id, {column_list} FROM input
+                    )
+                    SELECT id FROM input ORDER BY ord
+                    """,
+                    *args
+                )
+        
+        return [row['id'] for row in rows]
+    
+    async def save_agent_predictions_batch(self, predictions: List[AgentPrediction]) -> List[UUID4]:
+        """Save many agent predictions in one transaction, returning their IDs
+
+        With DB_PREDICTION_STAGING enabled the IDs only exist in agent_predictions
+        after the next merge; save_prediction_outcome(s) merges first for that reason.
+        """
+        if not predictions:
+            return []
+        
+        target = PREDICTION_STAGING_TABLE if self.config.prediction_staging else 'agent_predictions'
+        prediction_ids = await self._insert_batch_returning_ids(
+            target, PREDICTION_COLUMNS, PREDICTION_ARRAY_TYPES,
+            [self._prediction_record(p) for p in predictions],
+            copy_source='agent_predictions'
+        )
+        
+        logger.info(f"Saved {len(prediction_ids)} predictions in one batch")
+        return prediction_ids
+    
+    async def merge_staged_predictions(self) -> int:
+        """Move staged predictions into agent_predictions, returning the row count"""
+        async with self.get_connection() as conn:
+            row = await conn.fetchrow(MERGE_STAGED_PREDICTIONS_SQL)
+        
+        moved, rejected = row['merged'], row['rejected']
+        if moved:
+            logger.info(f"Merged {moved} staged predictions")
+        if rejected:
+            logger.warning(f"Moved {rejected} staged predictions with unknown agent or "
+                           f"instrument IDs to {PREDICTION_REJECTED_TABLE}")
+        return moved
+    
+    async def _merge_staged_predictions_loop(self):
+        """Periodically merge staged predictions until cancelled"""
+        while True:
+            await asyncio.sleep(self.config.staging_merge_interval)
+            try:
+                await self.merge_staged_predictions()
+            except Exception as e:
+                logger.error(f"Failed to merge staged predictions: {e}")
+    
+    async def save_prediction_outcomes_batch(self, outcomes: List[PredictionOutcome]) -> List[UUID4]:
+        """Save many prediction outcomes in one transaction, returning their IDs"""
+        if not outcomes:
+            return []
+        
+        if self.config.prediction_staging:
+            # Outcomes reference agent_predictions, so staged predictions must land first
+            await self.merge_staged_predictions()
+        
+        outcome_ids = await self._insert_batch_returning_ids(
+            'prediction_outcomes', OUTCOME_COLUMNS, OUTCOME_ARRAY_TYPES,
+            [tuple(getattr(outcome, column) for column in OUTCOME_COLUMNS) for outcome in outcomes]
+        )
+        
+        logger.info(f"Saved {len(outcome_ids)} outcomes in one batch")
+        return outcome_ids
+    
     async def save_prediction_outcome(self, outcome: PredictionOutcome) -> UUID4:
         """Save prediction outcome to database"""
+        if self.config.prediction_staging:
+            await self.merge_staged_predictions()
+        
         async with self.get_connection() as conn:
             outcome_id = await conn.fetchval(
-                """
-                INSERT INTO prediction_outcomes (
-                    prediction_id, actual_signal, actual_price_change, actual_return,
-                    max_favorable_move, max_adverse_move, is_correct, accuracy_score,
-                    return_score, risk_adjusted_return, sharpe_ratio, days_to_target,
-                    early_exit_reason
-                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13)
-                RETURNING id
-                """,
+                INSERT_OUTCOME_SQL,
                 outcome.prediction_id, outcome.actual_signal, outcome.actual_price_change,
                 outcome.actual_return, outcome.max_favorable_move, outcome.max_adverse_move,
                 outcome.is_correct, outcome.accuracy_score, outcome.return_score,
@@ -276,25 +896,21 @@ class DatabaseManager:
     
     async def get_agent_predictions(self, agent_id: UUID4, 
                                   limit: int = 100,
-                                  days_back: int = 30) -> List[Dict[str, Any]]:
-        """Get recent predictions for an agent"""
+                                  days_back: int = 30) -> List[asyncpg.Record]:
+        """Get recent predictions for an agent as read-only, dict-like records"""
         async with self.get_connection() as conn:
-            results = await conn.fetch(
-                """
-                SELECT ap.*, i.ticker, i.name as instrument_name,
-                       po.actual_return, po.is_correct, po.accuracy_score
-                FROM agent_predictions ap
-                JOIN instruments i ON ap.instrument_id = i.id
-                LEFT JOIN prediction_outcomes po ON ap.id = po.prediction_id
-                WHERE ap.agent_id = $1
-                  AND ap.prediction_timestamp >= NOW() - INTERVAL '%s days'
-                ORDER BY ap.prediction_timestamp DESC
-                LIMIT $2
-                """ % days_back,
-                agent_id, limit
-            )
-            
-            return [dict(row) for row in results]
+            return await conn.fetch(AGENT_PREDICTIONS_SQL, agent_id, limit, days_back)
+    
+    async def iter_agent_predictions(self, agent_id: UUID4,
+                                   limit: int = 100000,
+                                   days_back: int = 30,
+                                   prefetch: int = CURSOR_PREFETCH) -> AsyncIterator[asyncpg.Record]:
+        """Stream predictions for an agent through a server-side cursor"""
+        async with self.get_connection() as conn:
+            async with conn.transaction():
+                async for row in conn.cursor(AGENT_PREDICTIONS_SQL, agent_id, limit, days_back,
+                                             prefetch=prefetch):
+                    yield row
     
     # ============================================================================
     # PERFORMANCE ANALYTICS
@@ -306,97 +922,71 @@ class DatabaseManager:
                                         instrument_id: Optional[UUID4] = None) -> Dict[str, Any]:
         """Calculate comprehensive agent performance metrics"""
         async with self.get_connection() as conn:
-            # Use the stored function for basic metrics
-            basic_metrics = await conn.fetchrow(
-                "SELECT * FROM calculate_agent_performance($1, $2, $3, $4)",
+            metrics = await conn.fetchrow(
+                AGENT_PERFORMANCE_SQL,
                 agent_id, start_date, end_date, instrument_id
             )
-            
-            # Get additional detailed metrics
-            detailed_stats = await conn.fetchrow(
-                """
-                WITH prediction_stats AS (
-                    SELECT 
-                        ap.signal,
-                        ap.confidence,
-                        po.actual_return,
-                        po.is_correct,
-                        po.return_score,
-                        po.risk_adjusted_return,
-                        po.days_to_target
-                    FROM agent_predictions ap
-                    LEFT JOIN prediction_outcomes po ON ap.id = po.prediction_id
-                    WHERE ap.agent_id = $1
-                      AND ap.prediction_timestamp::date BETWEEN $2 AND $3
-                      AND ($4 IS NULL OR ap.instrument_id = $4)
-                      AND po.id IS NOT NULL
-                )
-                SELECT 
-                    COUNT(*) as total_predictions,
-                    AVG(confidence) as avg_confidence,
-                    STDDEV(COALESCE(return_score, 0)) as return_volatility,
-                    MAX(return_score) as best_return,
-                    MIN(return_score) as worst_return,
-                    AVG(days_to_target) as avg_days_to_target,
-                    COUNT(CASE WHEN signal = 'bullish' THEN 1 END) as bullish_predictions,
-                    COUNT(CASE WHEN signal = 'bearish' THEN 1 END) as bearish_predictions,
-                    COUNT(CASE WHEN signal = 'neutral' THEN 1 END) as neutral_predictions
-                FROM prediction_stats
-                """,
-                agent_id, start_date, end_date, instrument_id
-            )
-            
-            # Combine results
-            performance = {
-                'agent_id': str(agent_id),
-                'period_start': start_date.isoformat(),
-                'period_end': end_date.isoformat(),
-                'instrument_id': str(instrument_id) if instrument_id else None
-            }
-            
-            # Add metrics if available
-            if basic_metrics:
-                performance.update(dict(basic_metrics))
-            if detailed_stats:
-                performance.update(dict(detailed_stats))
-            
-            return performance
+        
+        # Combine results
+        performance = {
+            'agent_id': str(agent_id),
+            'period_start': start_date.isoformat(),
+            'period_end': end_date.isoformat(),
+            'instrument_id': str(instrument_id) if instrument_id else None
+        }
+        
+        # Add metrics if available
+        if metrics:
+            performance.update(dict(metrics))
+        
+        return performance
+    
+    async def refresh_agent_performance_view(self):
+        """Rebuild the agent leaderboard view without blocking readers"""
+        async with self.get_connection() as conn:
+            await conn.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {AGENT_PERF_VIEW}")
+        self._perf_view_refreshed_at = asyncio.get_running_loop().time()
+        logger.info(f"Refreshed {AGENT_PERF_VIEW}")
+    
+    async def _refresh_agent_performance_view_safely(self):
+        try:
+            await self.refresh_agent_performance_view()
+        except Exception as e:
+            logger.error(f"Failed to refresh {AGENT_PERF_VIEW}: {e}")
+    
+    def _schedule_agent_performance_refresh(self):
+        """Refresh the leaderboard view in the background once it is older than the interval"""
+        now = asyncio.get_running_loop().time()
+        stale = (self._perf_view_refreshed_at is None or
+                 now - self._perf_view_refreshed_at >= self.config.perf_view_refresh_interval)
+        in_flight = self._perf_view_task is not None and not self._perf_view_task.done()
+        if stale and not in_flight:
+            # Mark as refreshed up front so a failing refresh is not retried on every read
+            self._perf_view_refreshed_at = now
+            self._perf_view_task = asyncio.create_task(self._refresh_agent_performance_view_safely())
     
     async def get_top_performing_agents(self, limit: int = 10,
-                                      days_back: int = 30) -> List[Dict[str, Any]]:
+                                      days_back: int = 30) -> List[asyncpg.Record]:
         """Get top performing agents by accuracy and returns"""
+        if days_back == AGENT_PERF_VIEW_DAYS:
+            try:
+                async with self.get_connection() as conn:
+                    results = await conn.fetch(
+                        TOP_AGENTS_FROM_VIEW_SQL,
+                        limit
+                    )
+                self._schedule_agent_performance_refresh()
+                return results
+            except (asyncpg.UndefinedTableError, asyncpg.ObjectNotInPrerequisiteStateError) as e:
+                logger.warning(f"{AGENT_PERF_VIEW} unavailable, aggregating live: {e}")
+        
         async with self.get_connection() as conn:
             results = await conn.fetch(
-                """
-                WITH agent_stats AS (
-                    SELECT 
-                        a.id,
-                        a.name,
-                        a.display_name,
-                        a.type,
-                        COUNT(po.id) as total_predictions,
-                        AVG(CASE WHEN po.is_correct THEN 100.0 ELSE 0.0 END) as accuracy_rate,
-                        AVG(po.return_score) as avg_return,
-                        AVG(po.risk_adjusted_return) as avg_risk_adj_return
-                    FROM agents a
-                    JOIN agent_predictions ap ON a.id = ap.agent_id
-                    LEFT JOIN prediction_outcomes po ON ap.id = po.prediction_id
-                    WHERE ap.prediction_timestamp >= NOW() - INTERVAL '%s days'
-                      AND po.id IS NOT NULL
-                      AND a.is_active = true
-                    GROUP BY a.id, a.name, a.display_name, a.type
-                    HAVING COUNT(po.id) >= 5  -- Minimum predictions for ranking
-                )
-                SELECT *,
-                       ROW_NUMBER() OVER (ORDER BY accuracy_rate DESC, avg_return DESC) as rank
-                FROM agent_stats
-                ORDER BY accuracy_rate DESC, avg_return DESC
-                LIMIT $1
-                """ % days_back,
-                limit
+                TOP_AGENTS_LIVE_SQL,
+                limit, days_back
             )
             
-            return [dict(row) for row in results]
+            return results
     
     # ============================================================================
     # FEATURE STORE
@@ -411,74 +1001,58 @@ class DatabaseManager:
         
         async with self.get_connection() as conn:
             try:
-                # Build dynamic insert query based on available features
-                feature_columns = []
-                feature_values = []
-                placeholders = []
-                
-                # Standard feature mapping
-                feature_mapping = {
-                    'sma_10': features.get('sma_10'),
-                    'sma_50': features.get('sma_50'),
-                    'sma_200': features.get('sma_200'),
-                    'rsi_14': features.get('rsi_14'),
-                    'macd': features.get('macd'),
-                    'bollinger_upper': features.get('bollinger_upper'),
-                    'bollinger_lower': features.get('bollinger_lower'),
-                    'volume_ratio': features.get('volume_ratio'),
-                    'pe_ratio': features.get('pe_ratio'),
-                    'pb_ratio': features.get('pb_ratio'),
-                    'roe': features.get('roe'),
-                    'debt_to_equity': features.get('debt_to_equity'),
-                    'current_ratio': features.get('current_ratio'),
-                    'revenue_growth': features.get('revenue_growth'),
-                    'earnings_growth': features.get('earnings_growth'),
-                    'news_sentiment': features.get('news_sentiment'),
-                    'social_sentiment': features.get('social_sentiment'),
-                    'insider_activity_score': features.get('insider_activity_score'),
-                    'analyst_rating_avg': features.get('analyst_rating_avg'),
-                    'market_beta': features.get('market_beta'),
-                    'correlation_spy': features.get('correlation_spy'),
-                    'sector_performance': features.get('sector_performance'),
-                    'volatility_30d': features.get('volatility_30d')
-                }
-                
-                # Add base columns
-                feature_columns = ['instrument_id', 'feature_timestamp']
-                feature_values = [instrument_id, feature_timestamp]
-                placeholders = ['$1', '$2']
-                
-                param_count = 2
-                for col, value in feature_mapping.items():
-                    if value is not None:
-                        feature_columns.append(col)
-                        feature_values.append(value)
-                        param_count += 1
-                        placeholders.append(f'${param_count}')
-                
-                # Add custom features as JSON
-                custom_features = {k: v for k, v in features.items() 
-                                 if k not in feature_mapping}
-                if custom_features:
-                    feature_columns.append('custom_features')
-                    feature_values.append(json.dumps(custom_features))
-                    param_count += 1
-                    placeholders.append(f'${param_count}')
-                
-                query = f"""
-                INSERT INTO feature_store ({', '.join(feature_columns)})
-                VALUES ({', '.join(placeholders)})
-                ON CONFLICT (instrument_id, feature_timestamp) 
-                DO UPDATE SET {', '.join([f'{col} = EXCLUDED.{col}' for col in feature_columns[2:]])}
-                """
-                
-                await conn.execute(query, *feature_values)
+                await conn.execute(
+                    UPSERT_FEATURES_SQL,
+                    *self._feature_record(instrument_id, feature_timestamp, features)
+                )
                 return True
                 
             except Exception as e:
                 logger.error(f"Failed to save features: {e}")
                 return False
     
+    @staticmethod
+    def _feature_record(instrument_id: UUID4, feature_timestamp: datetime,
+                        features: Dict[str, Any]) -> tuple:
+        """Flatten one feature set into a row matching the feature batch table"""
+        custom_features = {k: v for k, v in features.items() if k not in FEATURE_COLUMN_SET}
+        return (
+            instrument_id, feature_timestamp,
+            *(features.get(column) for column in FEATURE_COLUMNS),
+            custom_features or None
+        )
+    
+    async def bulk_save_features(self, rows: Iterable[Tuple[UUID4, datetime, Dict[str, Any]]]) -> int:
+        """COPY many (instrument_id, feature_timestamp, features) rows into the feature store
+        
+        Meant for backfills; existing rows are updated exactly as save_features would.
+        Repeated (instrument_id, feature_timestamp) keys keep the last row, since one
+        INSERT ... ON CONFLICT cannot update the same row twice.
+        Returns the number of rows written.
+        """
+        latest = {}
+        for row in rows:
+            record = self._feature_record(*row)
+            latest[record[:2]] = record
+        records = list(latest.values())
+        if not records:
+            return 0
+        
+        async with self.get_connection() as conn:
+            async with conn.transaction():
+                await conn.execute(CREATE_FEATURE_BATCH_SQL)
+                await conn.copy_records_to_table(
+                    FEATURE_BATCH_TABLE,
+                    records=records,
+                    columns=_FEATURE_BATCH_COLUMNS
+                )
+                status = await conn.execute(MERGE_FEATURE_BATCH_SQL)
+        
+        # Command status looks like 'INSERT 0 <rows>'
+        written = int(status.split()[-1])
+        logger.info(f"Bulk saved {written} feature rows")
+        return written
+    
     # ============================================================================
     # SYSTEM HEALTH
     # ============================================================================
@@ -490,12 +1064,9 @@ class DatabaseManager:
         async with self.get_connection() as conn:
             try:
                 await conn.execute(
-                    """
-                    INSERT INTO system_health (component, status, metrics, error_message)
-                    VALUES ($1, $2, $3, $4)
-                    """,
+                    INSERT_SYSTEM_HEALTH_SQL,
                     component, status, 
-                    json.dumps(metrics) if metrics else None,
+                    metrics or None,
                     error_message
                 )
                 return True
@@ -503,24 +1074,47 @@ class DatabaseManager:
                 logger.error(f"Failed to log system health: {e}")
                 return False
     
-    async def get_system_health_status(self, hours_back: int = 24) -> List[Dict[str, Any]]:
+    async def get_system_health_status(self, hours_back: int = 24) -> List[asyncpg.Record]:
         """Get recent system health status"""
         async with self.get_connection() as conn:
             results = await conn.fetch(
-                """
-                SELECT component, status, metrics, error_message, health_timestamp
-                FROM system_health
-                WHERE health_timestamp >= NOW() - INTERVAL '%s hours'
-                ORDER BY health_timestamp DESC
-                """ % hours_back
+                SYSTEM_HEALTH_STATUS_SQL,
+                hours_back
             )
             
-            return [dict(row) for row in results]
+            return results
 
 # ============================================================================
 # UTILITY FUNCTIONS
 # ============================================================================
 
+# Process-wide manager shared by the API and the integration helpers
+_db: Optional[DatabaseManager] = None
+_db_lock: Optional[asyncio.Lock] = None
+
+async def get_db() -> DatabaseManager:
+    """Return the shared database manager, initializing its pool on first use"""
+    global _db, _db_lock
+    if _db is not None:
+        return _db
+    
+    # Created lazily so the lock binds to the running loop, not the import-time one
+    if _db_lock is None:
+        _db_lock = asyncio.Lock()
+    async with _db_lock:
+        if _db is None:
+            db = DatabaseManager()
+            await db.initialize()
+            _db = db
+    return _db
+
+async def close_db():
+    """Close the shared database manager, if one was created"""
+    global _db
+    if _db is not None:
+        db, _db = _db, None
+        await db.close()
+
 async def create_database_manager() -> DatabaseManager:
     """Create and initialize database manager"""
     db_manager = DatabaseManager()
@@ -529,7 +1123,9 @@ async def create_database_manager() -> DatabaseManager:
 
 def json_serializer(obj):
     """JSON serializer for complex objects"""
-    if isinstance(obj, (datetime, date)):
+    if isinstance(obj, asyncpg.Record):
+        return dict(obj)
+    elif isinstance(obj, (datetime, date)):
         return obj.isoformat()
     elif isinstance(obj, Decimal):
         return float(obj)
@@ -537,6 +1133,18 @@ def json_serializer(obj):
         return str(obj)
     raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
 
+def records_to_json(payload: Any) -> bytes:
+    """Serialize a response payload, including any asyncpg Records in it, straight to JSON bytes"""
+    return _json_bytes(payload)
+
+def run_async(main):
+    """Run a coroutine to completion on uvloop when it is installed, else the default loop"""
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.run(main)
+    return uvloop.run(main)
+
 # ============================================================================
 # EXAMPLE USAGE
 # ============================================================================
@@ -561,4 +1169,4 @@ async def example_usage():
         await db.close()
 
 if __name__ == "__main__":
-    asyncio.run(example_usage())
+    run_async(example_usage())
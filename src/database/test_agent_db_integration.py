@@ -0,0 +1,145 @@
+import asyncio
+import uuid
+
+import pytest
+
+pytest.importorskip("asyncpg")
+
+from src.database import agent_db_integration
+from src.database.agent_db_integration import AgentDatabaseIntegrator
+
+STOCK = "AAPL"
+CONTEXT = {STOCK: {"market": None, "price": None, "external": None}}
+
+
+@pytest.mark.parametrize("agent_stock_data, expected_days", [
+    ({"time_horizon": "30.5", "horizon_days": 10}, 10),
+    ({"time_horizon": "45"}, 45),
+    ({"time_horizon": 12.0}, 12),
+    ({"time_horizon": 7.5}, 30),
+    ({"time_horizon": float("nan"), "horizon_days": 14}, 14),
+    ({"time_horizon": float("inf")}, 30),
+    ({}, 30),
+])
+def test_vectorized_and_per_row_builds_parse_horizon_alike(agent_stock_data, expected_days):
+    integrator = AgentDatabaseIntegrator(db_manager=object())
+    agent_data = {STOCK: {"signal": "bullish", "confidence": 80, **agent_stock_data}}
+    pair = ("test_agent", uuid.uuid4(), uuid.uuid4(), STOCK, agent_data)
+
+    vectorized, _ = integrator._build_predictions_vectorized([pair], CONTEXT, "1.0")
+    per_row, _ = integrator._build_agent_stock_prediction(
+        pair[1], pair[2], agent_data, STOCK, CONTEXT[STOCK], "1.0"
+    )
+
+    assert vectorized[0].time_horizon_days == per_row.time_horizon_days == expected_days
+
+
+@pytest.mark.parametrize("agent_stock_data", [
+    {"signal": "bullish", "confidence_score": float("nan")},
+    {"confidence": float("nan"), "confidence_score": 85},
+    {"confidence": float("inf"), "certainty": 0.2},
+    {"signal": "bullish", "confidence": 80, "target_price": float("nan"), "price_target": 150,
+     "stop_loss": float("nan"), "position_size": float("-inf")},
+])
+def test_vectorized_and_per_row_builds_treat_nan_as_missing(agent_stock_data):
+    integrator = AgentDatabaseIntegrator(db_manager=object())
+    agent_data = {STOCK: agent_stock_data}
+    pair = ("test_agent", uuid.uuid4(), uuid.uuid4(), STOCK, agent_data)
+
+    vectorized, _ = integrator._build_predictions_vectorized([pair], CONTEXT, "1.0")
+    per_row, _ = integrator._build_agent_stock_prediction(
+        pair[1], pair[2], agent_data, STOCK, CONTEXT[STOCK], "1.0"
+    )
+
+    def scalars(prediction):
+        return prediction and (prediction.signal, prediction.confidence, prediction.target_price,
+                               prediction.stop_loss, prediction.position_size_pct)
+
+    assert scalars(vectorized[0] if vectorized else None) == scalars(per_row)
+
+
+class FakeDatabaseManager:
+    """Just enough of DatabaseManager for store_agent_analysis_results"""
+
+    def __init__(self):
+        self.agent_ids = {}
+        self.saved = []
+
+    async def get_agent_by_name(self, agent_name):
+        return {"id": self.agent_ids.setdefault(agent_name, uuid.uuid4())}
+
+    async def resolve_instrument_ids(self, instruments):
+        return {item[0]: uuid.uuid4() for item in instruments}
+
+    async def save_agent_predictions_batch(self, predictions):
+        self.saved.extend(predictions)
+        return [uuid.uuid4() for _ in predictions]
+
+
+def test_malformed_pair_does_not_drop_valid_predictions(monkeypatch):
+    real_source_hash = agent_db_integration._source_hash
+
+    def source_hash(agent_data):
+        if "malformed" in agent_data:
+            raise TypeError("unhashable agent output")
+        return real_source_hash(agent_data)
+
+    monkeypatch.setattr(agent_db_integration, "_source_hash", source_hash)
+    db = FakeDatabaseManager()
+    analysis_results = {
+        "metadata": {"stocks": [STOCK]},
+        "agents": [
+            {"name": "good_agent", STOCK: {"signal": "bullish", "confidence": 80}},
+            {"name": "bad_agent", STOCK: {"signal": "bearish", "confidence": 60, "malformed": True}},
+        ],
+    }
+
+    async def run():
+        integrator = AgentDatabaseIntegrator(db_manager=db)
+        try:
+            return await integrator.store_agent_analysis_results(analysis_results)
+        finally:
+            await integrator.close()
+
+    stats = asyncio.run(run())
+
+    assert stats["predictions_stored"] == 1
+    assert [p.signal for p in db.saved] == ["bullish"]
+    assert len(stats["errors"]) == 1 and "bad_agent" in stats["errors"][0]
+
+
+def test_source_hash_accepts_mixed_and_tuple_keys():
+    agent_stock_data = {"signal": "bullish", "confidence": 80,
+                        "eps_by_year": {2023: 1.0, "ttm": 2.0}, "pairs": {("AAPL", "MSFT"): 0.8}}
+    prediction, error = AgentDatabaseIntegrator(db_manager=object())._build_agent_stock_prediction(
+        uuid.uuid4(), uuid.uuid4(), {STOCK: agent_stock_data}, STOCK, CONTEXT[STOCK], "1.0"
+    )
+
+    assert error is None
+    assert prediction.reasoning["source_hash"] == agent_db_integration._source_hash(agent_stock_data)
+
+
+def test_writer_fails_waiters_when_ids_are_missing():
+    class ShortDatabaseManager(FakeDatabaseManager):
+        async def save_agent_predictions_batch(self, predictions):
+            return [uuid.uuid4()]
+
+    predictions = [
+        agent_db_integration.AgentPrediction(
+            agent_id=uuid.uuid4(), instrument_id=uuid.uuid4(), signal="neutral",
+            confidence=50.0, reasoning={}
+        )
+        for _ in range(2)
+    ]
+
+    async def run():
+        writer = agent_db_integration.PredictionWriter(ShortDatabaseManager())
+        writer.start()
+        try:
+            return await asyncio.wait_for(writer.submit(predictions, wait=True), timeout=5)
+        finally:
+            await writer.close()
+
+    results = asyncio.run(run())
+
+    assert len(results) == 2 and all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,153 @@
+import asyncio
+import importlib
+import os
+import sys
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip("asyncpg")
+
+from src.database import db_manager
+
+# Integration tests need a database with database/schema.sql applied
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+requires_db = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set")
+
+
+@pytest.fixture
+def db_without_orjson(monkeypatch):
+    """db_manager reloaded as if orjson were not installed"""
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    monkeypatch.setenv("DATABASE_URL", TEST_DATABASE_URL or "")
+    monkeypatch.setenv("DB_POOL_MIN", "1")
+    monkeypatch.setenv("DB_POOL_MAX", "2")
+    yield importlib.reload(db_manager)
+    monkeypatch.undo()
+    importlib.reload(db_manager)
+
+
+def test_jsonb_codec_is_binary_without_orjson(db_without_orjson):
+    encoded = db_without_orjson._jsonb_encode({"rsi": 55.5, "ts": datetime(2024, 1, 1)})
+    assert encoded[:1] == b"\x01"
+    assert db_without_orjson._jsonb_decode(encoded) == {"rsi": 55.5, "ts": "2024-01-01T00:00:00"}
+
+
+def test_agent_prediction_coerces_fields():
+    agent_id = uuid.uuid4()
+    prediction = db_manager.AgentPrediction(
+        agent_id=str(agent_id), instrument_id=uuid.uuid4(), signal="bullish",
+        confidence="72.5", reasoning={}, target_price=150, time_horizon_days=30.0
+    )
+    assert prediction.agent_id == agent_id
+    assert prediction.confidence == 72.5
+    assert prediction.target_price == 150.0
+    assert prediction.time_horizon_days == 30
+
+
+@pytest.mark.parametrize("overrides", [
+    {"agent_id": "not-a-uuid"},
+    {"signal": "buy"},
+    {"confidence": 150},
+    {"confidence": "high"},
+    {"time_horizon_days": 30.5},
+])
+def test_agent_prediction_rejects_invalid_fields(overrides):
+    fields = dict(agent_id=uuid.uuid4(), instrument_id=uuid.uuid4(), signal="neutral",
+                  confidence=50.0, reasoning={})
+    fields.update(overrides)
+    with pytest.raises(ValueError):
+        db_manager.AgentPrediction(**fields)
+
+
+def test_prediction_outcome_validates_fields():
+    outcome = db_manager.PredictionOutcome(prediction_id=str(uuid.uuid4()), actual_return="0.05", days_to_target=3)
+    assert outcome.actual_return == 0.05
+    with pytest.raises(ValueError):
+        db_manager.PredictionOutcome(prediction_id=uuid.uuid4(), actual_signal="up")
+
+
+@requires_db
+def test_bulk_save_features_without_orjson(db_without_orjson):
+    async def run():
+        db = db_without_orjson.DatabaseManager()
+        await db.initialize()
+        ticker = f"T{uuid.uuid4().hex[:8].upper()}"
+        try:
+            instrument_id = await db.create_instrument_if_not_exists(ticker, "Test instrument")
+            feature_timestamp = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+            # A repeated key must not abort the COPY; the last row wins like sequential save_features
+            written = await db.bulk_save_features([
+                (instrument_id, feature_timestamp, {"rsi_14": 40.0, "my_signal": 0.5}),
+                (instrument_id, feature_timestamp, {"rsi_14": 55.0, "my_signal": 1.5}),
+            ])
+            assert written == 1
+
+            async with db.get_connection() as conn:
+                row = await conn.fetchrow(
+                    "SELECT rsi_14, custom_features FROM feature_store WHERE instrument_id = $1",
+                    instrument_id
+                )
+            assert float(row["rsi_14"]) == 55.0
+            assert row["custom_features"] == {"my_signal": 1.5}
+        finally:
+            async with db.get_connection() as conn:
+                await conn.execute(
+                    "DELETE FROM feature_store WHERE instrument_id IN (SELECT id FROM instruments WHERE ticker = $1)",
+                    ticker
+                )
+                await conn.execute("DELETE FROM instruments WHERE ticker = $1", ticker)
+            await db.close()
+
+    asyncio.run(run())
+
+
+@requires_db
+@pytest.mark.parametrize("copy_threshold", [1000, 1])
+def test_save_agent_predictions_batch_without_orjson(db_without_orjson, monkeypatch, copy_threshold):
+    # A threshold of 1 sends the two-row batch down the COPY path
+    monkeypatch.setattr(db_without_orjson, "COPY_THRESHOLD", copy_threshold)
+
+    async def run():
+        db = db_without_orjson.DatabaseManager()
+        await db.initialize()
+        suffix = uuid.uuid4().hex[:8].upper()
+        agent_name, ticker = f"test_agent_{suffix}", f"T{suffix}"
+        try:
+            async with db.get_connection() as conn:
+                agent_id = await conn.fetchval(
+                    "INSERT INTO agents (name, type, display_name) VALUES ($1, 'test', $1) RETURNING id",
+                    agent_name
+                )
+            instrument_id = await db.create_instrument_if_not_exists(ticker, "Test instrument")
+
+            predictions = [
+                db_without_orjson.AgentPrediction(
+                    agent_id=agent_id, instrument_id=instrument_id, signal=signal,
+                    confidence=70.0, reasoning={"summary": signal}
+                )
+                for signal in ("bullish", "bearish")
+            ]
+            prediction_ids = await db.save_agent_predictions_batch(predictions)
+            assert len(prediction_ids) == 2
+
+            # IDs come back in input order on both the unnest and COPY paths
+            async with db.get_connection() as conn:
+                rows = await conn.fetch(
+                    "SELECT id, reasoning FROM agent_predictions WHERE id = ANY($1::uuid[])", prediction_ids
+                )
+            reasoning = {row["id"]: row["reasoning"] for row in rows}
+            assert [reasoning[i] for i in prediction_ids] == [{"summary": "bullish"}, {"summary": "bearish"}]
+        finally:
+            async with db.get_connection() as conn:
+                await conn.execute(
+                    "DELETE FROM agent_predictions WHERE agent_id IN (SELECT id FROM agents WHERE name = $1)",
+                    agent_name
+                )
+                await conn.execute("DELETE FROM agents WHERE name = $1", agent_name)
+                await conn.execute("DELETE FROM instruments WHERE ticker = $1", ticker)
+            await db.close()
+
+    asyncio.run(run())
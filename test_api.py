@@ -1,4 +1,7 @@
-import requests
+import asyncio
+import sys
+
+import httpx
 
 url = "http://127.0.0.1:8000/api/run"
 payload = {
@@ -7,6 +10,18 @@ payload = {
     "end_date": "2024-04-30",
     "initial_cash": 100000
 }
-response = requests.post(url, json=payload)
-print("Status Code:", response.status_code)
-print("Response:", response.text)
+
+# Optional request count for load runs: python test_api.py 10
+num_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+
+
+async def main():
+    # One pooled client so concurrent requests reuse keep-alive connections
+    async with httpx.AsyncClient(timeout=None) as client:
+        responses = await asyncio.gather(*(client.post(url, json=payload) for _ in range(num_requests)))
+    for response in responses:
+        print("Status Code:", response.status_code)
+        print("Response:", response.text)
+
+
+asyncio.run(main())